@@ -131,3 +131,12 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+
+# Live notificaties via Server-Sent Events (views.notification_stream). Alleen
+# aanzetten onder ASGI (config/asgi.py): onder WSGI/runserver houdt elke open
+# tab een worker thread vast. Uit = de bel haalt de dropdown bij elke klik op.
+NOTIFICATION_STREAM_ENABLED = os.environ.get("NOTIFICATION_STREAM_ENABLED", "") == "1"
+
+# Notificatie-events (SSE) delen tussen meerdere ASGI workers op dezelfde host.
+# None = alleen binnen het eigen proces (één worker).
+NOTIFICATION_EVENTS_SOCKET_DIR = os.environ.get("NOTIFICATION_EVENTS_SOCKET_DIR") or None
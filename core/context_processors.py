@@ -1,16 +1,20 @@
-from core.models import Notification, SignalCategory, Organization
-from core.services.notifications import ensure_notifications_for_user
+from core.models import NotificationCounter, SignalCategory, Organization
+from core.services import events
 
 def header_context(request):
     user = getattr(request, "user", None)
 
+    # alleen lezen: notificaties worden aangemaakt bij het opslaan van een Signal
     if user and user.is_authenticated:
-        ensure_notifications_for_user(user)
-        unread = Notification.objects.filter(user=user, is_read=False).count()
+        unread = NotificationCounter.get_unread(user.id)
     else:
         unread = 0
 
-    return {"unread_notifications_count": unread}
+    return {
+        "unread_notifications_count": unread,
+        # base.html opent alleen een EventSource als de stream aan staat
+        "notification_stream_enabled": events.enabled(),
+    }
 
 
 def portal_nav(request):
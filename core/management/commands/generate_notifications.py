@@ -1,45 +1,79 @@
-from django.core.management.base import BaseCommand
-from django.db import transaction
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
-from core.models import Signal, Notification
+from core.services.notifications import create_due_notifications
 
 
 class Command(BaseCommand):
     help = "Create in-app notifications for signals that should notify and are due."
 
-    @transaction.atomic
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Aantal signals per bulk_create / transactie (default 1000).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Alleen tellen, niets aanmaken.",
+        )
+        parser.add_argument(
+            "--since",
+            default="",
+            help="Alleen signals met active_from vanaf deze datum/tijd (YYYY-MM-DD of ISO datetime).",
+        )
+
     def handle(self, *args, **options):
-        now = timezone.localtime(timezone.now())
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size moet minimaal 1 zijn.")
+
+        since = self._parse_since(options["since"])
+        dry_run = options["dry_run"]
 
         # Eligible signals:
         # - notify=True
         # - assigned_to set
         # - active_from <= now
         # - status not done
-        qs = (
-            Signal.objects.select_related("person", "assigned_to", "category")
-            .filter(notify=True, assigned_to__isnull=False, active_from__lte=now)
-            .exclude(status="done")
+        # - nog geen notification voor (signal, assigned_to)
+        started = time.monotonic()
+        stats = create_due_notifications(
+            now=timezone.now(),
+            since=since,
+            batch_size=batch_size,
+            dry_run=dry_run,
         )
+        elapsed = time.monotonic() - started
 
-        created = 0
+        created = stats["created"]
+        rate = created / elapsed if elapsed > 0 else 0
+        verb = "Would create" if dry_run else "Created"
 
-        for s in qs:
-            # prevent duplicates: 1 notification per (signal, user)
-            exists = Notification.objects.filter(signal=s, user=s.assigned_to).exists()
-            if exists:
-                continue
+        self.stdout.write(self.style.SUCCESS(f"{verb} {created} notifications."))
+        self.stdout.write(
+            f"{stats['batches']} batch(es) of max {batch_size}, "
+            f"{elapsed:.3f}s, {rate:.0f} notifications/s."
+        )
 
-            student_url = f"/students/{s.person_id}/?tab=signals"
+    def _parse_since(self, value):
+        value = (value or "").strip()
+        if not value:
+            return None
 
-            Notification.objects.create(
-                user=s.assigned_to,
-                signal=s,
-                title=f"Melding: {s.title}",
-                body=s.body or "",
-                url=student_url,
-            )
-            created += 1
+        dt = parse_datetime(value)
+        if dt is None:
+            d = parse_date(value)
+            if d is None:
+                raise CommandError(f"Ongeldige --since waarde: {value!r}")
+            dt = datetime(d.year, d.month, d.day)
 
-        self.stdout.write(self.style.SUCCESS(f"Created {created} notifications."))
+        if timezone.is_naive(dt):
+            dt = timezone.make_aware(dt)
+        return dt
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Person
+from core.services.search import index_person
+
+
+class Command(BaseCommand):
+    help = "Bouw de zoektokens (PersonSearchToken) opnieuw op, bv. na een import via bulk_create/update()."
+
+    def handle(self, *args, **options):
+        people = Person.objects.only("id", "first_name", "last_name", "email", "city", "phone")
+        count = 0
+        for person in people.iterator(chunk_size=1000):
+            index_person(person)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} personen geïndexeerd."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.services.planned_days import rebuild_planned_days
+
+
+class Command(BaseCommand):
+    help = "Bouw PlannedDay opnieuw op uit Roster, RosterDay en RosterDayWork (bv. na een import)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=200, help="Aantal personen per batch.")
+
+    def handle(self, *args, **options):
+        rows, persons = rebuild_planned_days(options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"{rows} dagen voor {persons} personen opgebouwd."))
@@ -0,0 +1,115 @@
+import heapq
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core.services.notifications import create_due_notifications, upcoming_signals
+
+
+class Command(BaseCommand):
+    help = (
+        "Long-running scheduler: maakt notificaties aan op het moment dat "
+        "Signal.active_from verstrijkt, in plaats van te wachten op cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh",
+            type=int,
+            default=30,
+            help="Elke N seconden gewijzigde signals opnieuw inlezen (default 30).",
+        )
+        parser.add_argument(
+            "--horizon",
+            type=int,
+            default=24,
+            help="Alleen signals die binnen N uur actief worden in het geheugen houden (default 24).",
+        )
+
+    def handle(self, *args, **options):
+        if options["refresh"] < 1 or options["horizon"] < 1:
+            raise CommandError("--refresh en --horizon moeten minimaal 1 zijn.")
+
+        self.refresh = timedelta(seconds=options["refresh"])
+        self.horizon = timedelta(hours=options["horizon"])
+
+        # priority queue van (active_from, signal_id); due_at is de actuele
+        # waarde per signal, zodat verouderde heap entries overgeslagen worden
+        self.heap = []
+        self.due_at = {}
+
+        now = timezone.now()
+
+        # inhalen wat al due is (bv. terwijl de scheduler uit stond)
+        stats = create_due_notifications(now=now)
+        self.stdout.write(f"Catch-up: {stats['created']} notifications.")
+
+        self.loaded_until = now
+        self.last_refresh = now
+        self._extend(now)
+
+        self.stdout.write(self.style.SUCCESS(f"Scheduler gestart, {len(self.due_at)} signal(s) gepland."))
+
+        try:
+            while True:
+                self._tick()
+        except KeyboardInterrupt:
+            self.stdout.write("Scheduler gestopt.")
+
+    def _push(self, signal_id, active_from):
+        if self.due_at.get(signal_id) == active_from:
+            return
+        self.due_at[signal_id] = active_from
+        heapq.heappush(self.heap, (active_from, signal_id))
+
+    def _extend(self, now):
+        # venster (loaded_until, now + horizon] bijladen
+        until = now + self.horizon
+        for signal_id, active_from in upcoming_signals(self.loaded_until, until):
+            self._push(signal_id, active_from)
+        self.loaded_until = until
+
+    def _refresh(self, now):
+        # signals die sinds de vorige refresh zijn aangemaakt/gewijzigd; ondergrens
+        # is de vorige refresh, niet now: een signal die tussendoor is opgeslagen
+        # en inmiddels al actief is, gaat zo alsnog op de heap en _fire_due pakt
+        # hem bij de volgende tick meteen op
+        for signal_id, active_from in upcoming_signals(self.last_refresh, self.loaded_until, changed_since=self.last_refresh):
+            self._push(signal_id, active_from)
+        self.last_refresh = now
+        self._extend(now)
+
+    def _fire_due(self, now):
+        due_ids = []
+        while self.heap and self.heap[0][0] <= now:
+            active_from, signal_id = heapq.heappop(self.heap)
+            if self.due_at.get(signal_id) != active_from:
+                continue
+            del self.due_at[signal_id]
+            due_ids.append(signal_id)
+
+        if due_ids:
+            # due_signals controleert opnieuw of ze nog in aanmerking komen
+            stats = create_due_notifications(now=now, signal_ids=due_ids)
+            self.stdout.write(f"{timezone.localtime(now):%Y-%m-%d %H:%M:%S} {len(due_ids)} due, {stats['created']} notifications.")
+
+    def _tick(self):
+        now = timezone.now()
+        wake = self.last_refresh + self.refresh
+        if self.heap:
+            wake = min(wake, self.heap[0][0])
+
+        delay = (wake - now).total_seconds()
+        if delay > 0:
+            time.sleep(delay)
+
+        close_old_connections()
+        now = timezone.now()
+
+        self._fire_due(now)
+
+        if now >= self.last_refresh + self.refresh:
+            self._refresh(now)
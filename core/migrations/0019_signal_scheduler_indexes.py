@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_notification_signal_user_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='signal',
+            index=models.Index(condition=models.Q(('assigned_to__isnull', False), ('notify', True), models.Q(('status', 'done'), _negated=True)), fields=['active_from'], name='signal_notify_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signal',
+            index=models.Index(fields=['updated_at'], name='signal_updated_at_idx'),
+        ),
+    ]
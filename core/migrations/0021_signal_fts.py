@@ -0,0 +1,110 @@
+from django.db import migrations, OperationalError
+
+# FTS5 index over signal titel/tekst, notities en persoonsnaam (rowid = signal id).
+# Wordt door triggers bijgehouden, zodat ook queryset.update()/bulk_create
+# en deletes via de ORM de index niet laten verlopen.
+
+PERSON_NAME = "(SELECT first_name || ' ' || last_name FROM core_person WHERE id = {ref}.person_id)"
+NOTES = "(SELECT group_concat(body, ' ') FROM core_signalnote WHERE signal_id = {ref})"
+
+CREATE = [
+    """
+    CREATE VIRTUAL TABLE core_signal_fts USING fts5(
+        title, body, notes, person_name,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER core_signal_fts_ai AFTER INSERT ON core_signal BEGIN
+        INSERT INTO core_signal_fts(rowid, title, body, notes, person_name)
+        VALUES (new.id, new.title, new.body, '', {PERSON_NAME.format(ref="new")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER core_signal_fts_au AFTER UPDATE OF title, body, person_id ON core_signal BEGIN
+        UPDATE core_signal_fts
+        SET title = new.title, body = new.body, person_name = {PERSON_NAME.format(ref="new")}
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER core_signal_fts_ad AFTER DELETE ON core_signal BEGIN
+        DELETE FROM core_signal_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER core_signalnote_fts_ai AFTER INSERT ON core_signalnote BEGIN
+        UPDATE core_signal_fts SET notes = {NOTES.format(ref="new.signal_id")}
+        WHERE rowid = new.signal_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER core_signalnote_fts_au AFTER UPDATE OF body, signal_id ON core_signalnote BEGIN
+        UPDATE core_signal_fts SET notes = {NOTES.format(ref="old.signal_id")}
+        WHERE rowid = old.signal_id;
+        UPDATE core_signal_fts SET notes = {NOTES.format(ref="new.signal_id")}
+        WHERE rowid = new.signal_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER core_signalnote_fts_ad AFTER DELETE ON core_signalnote BEGIN
+        UPDATE core_signal_fts SET notes = {NOTES.format(ref="old.signal_id")}
+        WHERE rowid = old.signal_id;
+    END
+    """,
+    """
+    CREATE TRIGGER core_person_fts_au AFTER UPDATE OF first_name, last_name ON core_person BEGIN
+        UPDATE core_signal_fts SET person_name = new.first_name || ' ' || new.last_name
+        WHERE rowid IN (SELECT id FROM core_signal WHERE person_id = new.id);
+    END
+    """,
+    f"""
+    INSERT INTO core_signal_fts(rowid, title, body, notes, person_name)
+    SELECT s.id, s.title, s.body, coalesce({NOTES.format(ref="s.id")}, ''), {PERSON_NAME.format(ref="s")}
+    FROM core_signal s
+    """,
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS core_person_fts_au",
+    "DROP TRIGGER IF EXISTS core_signalnote_fts_ad",
+    "DROP TRIGGER IF EXISTS core_signalnote_fts_au",
+    "DROP TRIGGER IF EXISTS core_signalnote_fts_ai",
+    "DROP TRIGGER IF EXISTS core_signal_fts_ad",
+    "DROP TRIGGER IF EXISTS core_signal_fts_au",
+    "DROP TRIGGER IF EXISTS core_signal_fts_ai",
+    "DROP TABLE IF EXISTS core_signal_fts",
+]
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    # savepoint: zonder FTS5 blijft de migratie slagen (search valt terug op icontains)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SAVEPOINT core_signal_fts")
+        try:
+            for sql in CREATE:
+                cursor.execute(sql)
+        except OperationalError:
+            cursor.execute("ROLLBACK TO SAVEPOINT core_signal_fts")
+        cursor.execute("RELEASE SAVEPOINT core_signal_fts")
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in DROP:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_signal_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,44 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from core.services.search import person_tokens
+
+    Person = apps.get_model("core", "Person")
+    PersonSearchToken = apps.get_model("core", "PersonSearchToken")
+
+    batch = []
+    people = Person.objects.values_list("id", "first_name", "last_name", "email", "city", "phone")
+    for person_id, first_name, last_name, email, city, phone in people.iterator(chunk_size=2000):
+        batch.extend(
+            PersonSearchToken(person_id=person_id, token=t)
+            for t in person_tokens(first_name, last_name, email, city, phone)
+        )
+        if len(batch) >= 5000:
+            PersonSearchToken.objects.bulk_create(batch)
+            batch = []
+    PersonSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_signal_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100)),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='core.person')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'person'], name='person_search_token_idx')],
+                'constraints': [models.UniqueConstraint(fields=('person', 'token'), name='person_search_token_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
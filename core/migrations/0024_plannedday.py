@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_person_type_name_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlannedDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(default='work', max_length=20)),
+                ('planned_hours', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=5)),
+                ('actual_hours', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=5)),
+                ('work_hours', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=6)),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='planned_days', to='core.person')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'person'], name='planned_day_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('person', 'date'), name='uniq_person_date_planned')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def dedupe(apps, schema_editor):
+    Notification = apps.get_model("core", "Notification")
+    NotificationCounter = apps.get_model("core", "NotificationCounter")
+
+    # per (signal, user) de oudste notificatie houden
+    dupes = (
+        Notification.objects
+        .filter(signal__isnull=False)
+        .values("signal_id", "user_id")
+        .annotate(n=Count("id"), keep=Min("id"))
+        .filter(n__gt=1)
+    )
+    users = set()
+    for row in dupes:
+        Notification.objects.filter(signal_id=row["signal_id"], user_id=row["user_id"]).exclude(id=row["keep"]).delete()
+        users.add(row["user_id"])
+
+    # tellers van de geraakte users opnieuw tellen
+    for user_id in users:
+        unread = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        NotificationCounter.objects.update_or_create(user_id=user_id, defaults={"unread": unread})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_plannedday'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notif_signal_user_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('signal', 'user'), name='uniq_notification_signal_user'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+"""
+Week A/B uren en cycle_start_date op Roster.
+
+0016 is zonder operaties uitgeleverd: een database die uit de migraties is
+opgebouwd heeft nog mon_hours..sun_hours, terwijl bestaande installaties de
+A/B kolommen al met de hand hebben gekregen. De state krijgt hier alsnog de
+velden; op de database wordt alleen toegevoegd wat ontbreekt. Oude week-uren
+gaan naar zowel week A als B, zoals 0016 bedoelde.
+"""
+from decimal import Decimal
+
+from django.db import migrations, models
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+WEEK_FIELDS = [f"{day}_{week}_hours" for week in "ab" for day in DAYS]
+
+
+def hours_field():
+    return models.DecimalField(decimal_places=2, default=Decimal("0"), max_digits=5)
+
+
+def add_missing_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    quote = schema_editor.quote_name
+    table = quote("core_roster")
+    with connection.cursor() as cursor:
+        columns = {c.name for c in connection.introspection.get_table_description(cursor, "core_roster")}
+
+    hours_type = hours_field().db_type(connection)
+    for name in WEEK_FIELDS:
+        if name not in columns:
+            schema_editor.execute(f"ALTER TABLE {table} ADD COLUMN {quote(name)} {hours_type} NOT NULL DEFAULT 0")
+    if "cycle_start_date" not in columns:
+        date_type = models.DateField().db_type(connection)
+        schema_editor.execute(f"ALTER TABLE {table} ADD COLUMN {quote('cycle_start_date')} {date_type} NULL")
+
+    old = [day for day in DAYS if f"{day}_hours" in columns]
+    if old:
+        assignments = [
+            f"{quote(f'{day}_{week}_hours')} = {quote(f'{day}_hours')}" for day in old for week in "ab"
+        ]
+        assignments.append(f"{quote('cycle_start_date')} = COALESCE({quote('cycle_start_date')}, {quote('start_date')})")
+        schema_editor.execute(f"UPDATE {table} SET {', '.join(assignments)}")
+        for day in old:
+            schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN {quote(f'{day}_hours')}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_notification_uniq_signal_user'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_missing_columns, migrations.RunPython.noop),
+            ],
+            state_operations=[
+                *[migrations.RemoveField(model_name='roster', name=f'{day}_hours') for day in DAYS],
+                migrations.AddField(
+                    model_name='roster',
+                    name='cycle_start_date',
+                    field=models.DateField(blank=True, null=True),
+                ),
+                *[migrations.AddField(model_name='roster', name=name, field=hours_field()) for name in WEEK_FIELDS],
+            ],
+        ),
+    ]
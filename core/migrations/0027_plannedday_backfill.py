@@ -0,0 +1,64 @@
+"""
+Vult PlannedDay voor bestaande roosters en dagen (0024 maakte alleen de
+tabel). Alle reads en writes gaan via de historische modellen; alleen de
+rekenregels (RosterCalendar, planned_rows) komen uit de services, zoals 0022
+dat met person_tokens doet. Na een import of loaddata die save() omzeilt:
+`manage.py rebuild_planned_days`.
+"""
+from django.db import migrations
+from django.db.models import Sum
+
+CHUNK_SIZE = 200
+
+
+def backfill(apps, schema_editor):
+    from core.services.planned_days import planned_rows
+    from core.services.roster_calendar import RosterCalendar
+
+    Roster = apps.get_model("core", "Roster")
+    RosterDay = apps.get_model("core", "RosterDay")
+    RosterDayWork = apps.get_model("core", "RosterDayWork")
+    PlannedDay = apps.get_model("core", "PlannedDay")
+
+    person_ids = sorted(
+        set(Roster.objects.values_list("person_id", flat=True))
+        | set(RosterDay.objects.values_list("person_id", flat=True).distinct())
+        | set(RosterDayWork.objects.values_list("person_id", flat=True).distinct())
+    )
+    PlannedDay.objects.all().delete()
+
+    for i in range(0, len(person_ids), CHUNK_SIZE):
+        chunk = person_ids[i:i + CHUNK_SIZE]
+        rosters = list(Roster.objects.filter(person_id__in=chunk))
+        overrides = {(rd.person_id, rd.date): rd for rd in RosterDay.objects.filter(person_id__in=chunk)}
+        work_totals = {
+            (person_id, d): total
+            for person_id, d, total in RosterDayWork.objects.filter(person_id__in=chunk)
+            .order_by().values_list("person_id", "date").annotate(total=Sum("hours"))
+        }
+        dates = (
+            [r.start_date for r in rosters] + [r.end_date for r in rosters]
+            + [d for _, d in overrides] + [d for _, d in work_totals]
+        )
+        rows = planned_rows(RosterCalendar(rosters), overrides, work_totals, chunk, min(dates), max(dates))
+        PlannedDay.objects.bulk_create(
+            [
+                PlannedDay(
+                    person_id=person_id, date=d, status=status,
+                    planned_hours=planned, actual_hours=actual, work_hours=work,
+                )
+                for person_id, d, status, planned, actual, work in rows
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_roster_week_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,37 @@
+"""
+Herindexeert PersonSearchToken met de suffix-tokens van person_tokens, zodat
+substring- en telefoonzoeken via person_search_token_idx gaan i.p.v. een
+icontains scan over core_person. Zelfde opzet als de backfill in 0022.
+"""
+from django.db import migrations
+
+
+def reindex(apps, schema_editor):
+    from core.services.search import person_tokens
+
+    Person = apps.get_model("core", "Person")
+    PersonSearchToken = apps.get_model("core", "PersonSearchToken")
+
+    PersonSearchToken.objects.all().delete()
+    batch = []
+    people = Person.objects.values_list("id", "first_name", "last_name", "email", "city", "phone")
+    for person_id, first_name, last_name, email, city, phone in people.iterator(chunk_size=2000):
+        batch.extend(
+            PersonSearchToken(person_id=person_id, token=t)
+            for t in person_tokens(first_name, last_name, email, city, phone)
+        )
+        if len(batch) >= 5000:
+            PersonSearchToken.objects.bulk_create(batch)
+            batch = []
+    PersonSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_plannedday_backfill'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,57 @@
+"""
+updated_at op Person en SignalCategory, voor de ETags van de notificatielijst
+en -dropdown (die tonen naam en categorie).
+
+Een gewone AddField bouwt core_person op SQLite opnieuw op, en daarbij gaan
+de FTS triggers uit 0021 stuk (core_person_fts_au verdwijnt, de triggers op
+core_signal verwijzen naar een tabel die even niet bestaat). Daarom, net als
+0026, een ALTER TABLE ADD COLUMN en alleen de state via AddField.
+"""
+from django.db import migrations, models
+from django.utils import timezone
+
+TABLES = ("core_person", "core_signalcategory")
+
+
+def add_columns(apps, schema_editor):
+    quote = schema_editor.quote_name
+    column_type = models.DateTimeField().db_type(schema_editor.connection)
+    for table in TABLES:
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} ADD COLUMN {quote('updated_at')} {column_type} "
+            "NOT NULL DEFAULT '1970-01-01 00:00:00'"
+        )
+        schema_editor.execute(f"UPDATE {quote(table)} SET {quote('updated_at')} = %s", [timezone.now()])
+
+
+def drop_columns(apps, schema_editor):
+    quote = schema_editor.quote_name
+    for table in TABLES:
+        schema_editor.execute(f"ALTER TABLE {quote(table)} DROP COLUMN {quote('updated_at')}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_personsearchtoken_suffixes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_columns, drop_columns),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='person',
+                    name='updated_at',
+                    field=models.DateTimeField(auto_now=True),
+                ),
+                migrations.AddField(
+                    model_name='signalcategory',
+                    name='updated_at',
+                    field=models.DateTimeField(auto_now=True),
+                ),
+            ],
+        ),
+    ]
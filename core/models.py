@@ -1,9 +1,13 @@
 # core/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.conf import settings
 from django.utils import timezone
 from decimal import Decimal
 
+from core.services import events
+
+
 class Location(models.Model):
     name = models.CharField(max_length=100, unique=True)
 
@@ -73,10 +77,40 @@ class Person(models.Model):
 
     notes = models.TextField(blank=True)
 
+    # ETag van notificatielijst en -dropdown (die tonen de naam)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # personenlijsten: filter op type, keyset op (achternaam, voornaam, id)
+            models.Index(fields=["person_type", "last_name", "first_name"], name="person_type_name_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name}"
 
 
+class PersonSearchToken(models.Model):
+    """
+    Genormaliseerde zoektokens per persoon (zonder accenten, lowercase), zie
+    core.services.search. Bijgehouden door core.receivers; prefix-zoeken
+    gaat als range scan over person_search_token_idx.
+    """
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name="search_tokens")
+    token = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["person", "token"], name="person_search_token_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["token", "person"], name="person_search_token_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.person_id} {self.token}"
+
+
 class StudentProfile(models.Model):
     STATUS_CHOICES = [
         ("pending", "Nog beginnen"),
@@ -138,6 +172,7 @@ class StudentDocument(models.Model):
 class SignalCategory(models.Model):
     key = models.SlugField(max_length=50, unique=True)
     name = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -179,6 +214,25 @@ class Signal(models.Model):
 
     class Meta:
         ordering = ["-active_from", "-created_at"]
+        indexes = [
+            # run_notification_scheduler: komende active_from tijden + wijzigingen
+            models.Index(
+                fields=["active_from"],
+                name="signal_notify_due_idx",
+                condition=models.Q(notify=True, assigned_to__isnull=False) & ~models.Q(status="done"),
+            ),
+            models.Index(fields=["updated_at"], name="signal_updated_at_idx"),
+            # dashboard tellingen + status filter in signal_list
+            models.Index(fields=["status", "active_from"], name="signal_status_active_idx"),
+            # signal_list standaard (active_from <= nu), ook met show_done
+            models.Index(fields=["active_from"], name="signal_active_from_idx"),
+            # notification_list / "alleen mij": open signals per behandelaar op active_from
+            models.Index(
+                fields=["assigned_to", "active_from"],
+                name="signal_assignee_open_idx",
+                condition=~models.Q(status="done"),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.person} - {self.title}"
@@ -225,12 +279,75 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["is_read", "-created_at"]
+        constraints = [
+            # 1 notificatie per (signal, user); de index dient ook de anti-join
+            # "heeft deze signal al een notificatie voor deze user?"
+            models.UniqueConstraint(fields=["signal", "user"], name="uniq_notification_signal_user"),
+        ]
+        indexes = [
+            # dropdown: ongelezen notificaties van een user, nieuwste eerst
+            models.Index(
+                fields=["user", "-created_at"],
+                name="notif_user_unread_idx",
+                condition=models.Q(is_read=False),
+            ),
+        ]
 
     def mark_read(self):
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=["is_read", "read_at"])
+            with transaction.atomic():
+                # conditionele update: bij gelijktijdige clicks telt er maar één
+                updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+                    is_read=True, read_at=self.read_at
+                )
+                NotificationCounter.bump(self.user_id, -updated)
+
+
+class NotificationCounter(models.Model):
+    """
+    Gedenormaliseerd aantal ongelezen notificaties per user (badge in de header).
+
+    Wordt bijgewerkt met F()-expressies, zodat gelijktijdige updates elkaar
+    niet overschrijven. Ontbreekt de rij, dan wordt hij opnieuw geteld.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notification_counter",
+    )
+    unread = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread}"
+
+    @classmethod
+    def recount(cls, user_id):
+        unread = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cls.objects.update_or_create(user_id=user_id, defaults={"unread": unread})
+        return unread
+
+    @classmethod
+    def bump(cls, user_id, delta):
+        if not delta:
+            return
+        if not cls.objects.filter(user_id=user_id).update(unread=F("unread") + delta):
+            cls.recount(user_id)
+        transaction.on_commit(lambda: cls.publish(user_id))
+
+    @classmethod
+    def publish(cls, user_id):
+        # live badge update voor open SSE verbindingen
+        if events.wants(user_id):
+            events.publish(user_id, "unread", {"count": cls.get_unread(user_id)})
+
+    @classmethod
+    def get_unread(cls, user_id):
+        unread = cls.objects.filter(user_id=user_id).values_list("unread", flat=True).first()
+        if unread is None:
+            unread = cls.recount(user_id)
+        return unread
 
 class SignalNote(models.Model):
     signal = models.ForeignKey("Signal", on_delete=models.CASCADE, related_name="notes")
@@ -346,3 +463,27 @@ class RosterDayWork(models.Model):
         ]
         ordering = ["date", "work_package__sort_order", "work_package__code"]
 
+
+class PlannedDay(models.Model):
+    """
+    Afgeleide tabel: per persoon per dag de uitkomst van Roster + RosterDay +
+    RosterDayWork, zodat rapportages gepland vs. werkelijk in SQL kunnen
+    optellen. Wordt bijgehouden door core.services.planned_days; niet met de
+    hand bewerken. Dagen zonder rooster, override of werkpakket-uren hebben
+    geen rij (alles 0).
+    """
+    person = models.ForeignKey("core.Person", on_delete=models.CASCADE, related_name="planned_days")
+    date = models.DateField()
+    status = models.CharField(max_length=20, default="work")
+    planned_hours = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal("0"))
+    actual_hours = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal("0"))
+    work_hours = models.DecimalField(max_digits=6, decimal_places=2, default=Decimal("0"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["person", "date"], name="uniq_person_date_planned")
+        ]
+        indexes = [
+            models.Index(fields=["date", "person"], name="planned_day_date_idx"),
+        ]
+
@@ -0,0 +1,96 @@
+"""
+Keyset (cursor) paginering.
+
+In plaats van OFFSET + COUNT(*) onthoudt de cursor de sorteerwaarden van de
+laatste (of eerste) rij van de pagina. De volgende pagina is dan een
+"WHERE (sorteerwaarden) > (cursor)" op dezelfde volgorde, zodat pagina N
+evenveel kost als pagina 1. Het totaal wordt afgekapt op COUNT_CAP.
+"""
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+
+COUNT_CAP = 1000
+
+
+def _json_default(o):
+    # volledige isoformat (incl. microseconden), anders klopt de vergelijking niet
+    if hasattr(o, "isoformat"):
+        return o.isoformat()
+    return str(o)
+
+
+def encode_cursor(values, direction):
+    raw = json.dumps({"v": values, "d": direction}, default=_json_default)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, n_keys):
+    if not token:
+        return None, "next"
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        values, direction = data["v"], data["d"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None, "next"
+    if direction not in ("next", "prev") or not isinstance(values, list) or len(values) != n_keys:
+        return None, "next"
+    return values, direction
+
+
+def _beyond(keys, values):
+    # (k1, k2, ...) voorbij (v1, v2, ...) in de gegeven richting per key
+    q = Q()
+    for i, (name, desc) in enumerate(keys):
+        cond = Q(**{f"{name}__{'lt' if desc else 'gt'}": values[i]})
+        for (prev_name, _), prev_value in zip(keys[:i], values[:i]):
+            cond &= Q(**{prev_name: prev_value})
+        q |= cond
+    return q
+
+
+def keyset_paginate(qs, keys, cursor="", per_page=25, count_cap=COUNT_CAP):
+    """
+    keys: volledige sorteervolgorde als [(attribuut, desc), ...]; de laatste
+    key moet uniek zijn (bv. ("id", True)). Joins/expressies eerst annotaten,
+    zodat elke key ook een attribuut op de rij is.
+    """
+    values, direction = decode_cursor(cursor, len(keys))
+    backwards = values is not None and direction == "prev"
+
+    page_keys = [(name, not desc) for name, desc in keys] if backwards else list(keys)
+    ordered = qs.order_by(*[("-" if desc else "") + name for name, desc in page_keys])
+
+    if values is not None:
+        # de eerste key als losse range erbij: zelfde resultaat, maar de database
+        # kan dan in de index op die plek beginnen i.p.v. vooraan te scannen
+        first, first_desc = page_keys[0]
+        start = Q(**{f"{first}__{'lte' if first_desc else 'gte'}": values[0]})
+        ordered = ordered.filter(start & _beyond(page_keys, values))
+
+    rows = list(ordered[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    has_next = has_more if not backwards else True
+    has_previous = values is not None and (has_more if backwards else True)
+
+    def row_values(row):
+        return [getattr(row, name) for name, _ in keys]
+
+    total = qs.order_by().values("pk")[:count_cap + 1].count()
+
+    return {
+        "object_list": rows,
+        "has_next": has_next and bool(rows),
+        "has_previous": has_previous and bool(rows),
+        "next_cursor": encode_cursor(row_values(rows[-1]), "next") if rows else "",
+        "prev_cursor": encode_cursor(row_values(rows[0]), "prev") if rows else "",
+        "total": min(total, count_cap),
+        "total_capped": total > count_cap,
+    }
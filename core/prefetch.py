@@ -0,0 +1,53 @@
+"""
+Top-N prefetch: alleen de nieuwste N kinderen per parent ophalen.
+
+prefetch_related("notes") haalt álle notities van elke signal op; bij
+signals met honderden history-regels groeit het geheugen per request mee.
+prefetch_top_n nummert de kinderen per parent met ROW_NUMBER() en telt ze
+met COUNT(*) OVER (PARTITION BY ...), in één query, en houdt alleen rij
+1..N over. Het totaal blijft beschikbaar voor een "bekijk alle"-link.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+
+def prefetch_top_n(instances, related_name, n, order_by, to_attr, count_attr, select_related=()):
+    """
+    Zet op elke instance `to_attr` (lijst met max n kinderen, in order_by
+    volgorde) en `count_attr` (totaal aantal kinderen).
+
+    related_name: reverse FK, bv. "notes"; order_by: bv. ("-created_at", "-id").
+    """
+    instances = [obj for obj in instances if obj is not None]
+    if not instances:
+        return instances
+
+    rel = instances[0]._meta.get_field(related_name)
+    fk = rel.field.attname  # bv. "signal_id"
+    partition = F(fk)
+
+    children = (
+        rel.related_model.objects
+        .filter(**{f"{fk}__in": {obj.pk for obj in instances}})
+        .select_related(*select_related)
+        .annotate(
+            row_number=Window(RowNumber(), partition_by=partition, order_by=list(order_by)),
+            parent_total=Window(Count("pk"), partition_by=partition),
+        )
+        .filter(row_number__lte=n)
+        .order_by(fk, "row_number")
+    )
+
+    grouped = defaultdict(list)
+    totals = {}
+    for child in children:
+        parent_id = getattr(child, fk)
+        grouped[parent_id].append(child)
+        totals[parent_id] = child.parent_total
+
+    for obj in instances:
+        setattr(obj, to_attr, grouped.get(obj.pk, []))
+        setattr(obj, count_attr, totals.get(obj.pk, 0))
+    return instances
@@ -0,0 +1,84 @@
+from datetime import date
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.models import Person, Roster, RosterDay, RosterDayWork, Signal, StudentProfile
+from core.services.notifications import notify_assignee
+from core.services.planned_days import refresh_planned_days
+from core.services.search import index_person
+from core.services.student_facets import invalidate_student_facets
+
+
+@receiver(post_save, sender=Signal)
+def signal_saved(sender, instance, raw=False, **kwargs):
+    # notificaties ontstaan bij de oorzaak, niet meer bij elke page render
+    if raw:
+        return
+    notify_assignee(instance)
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_delete, sender=Person)
+def people_changed(sender, instance, **kwargs):
+    # facet-tellingen van de personenlijsten zijn dan verouderd
+    invalidate_student_facets()
+
+
+@receiver(post_save, sender=Person)
+def person_saved(sender, instance, raw=False, **kwargs):
+    # zoektokens voor search_people (student/employee/person/signal lijsten)
+    if raw:
+        return
+    index_person(instance)
+    invalidate_student_facets()
+
+
+def _planned_range(instance):
+    # (person_id, start, end); de roster views zetten POST strings op het model
+    if isinstance(instance, Roster):
+        start, end = instance.start_date, instance.end_date
+    else:
+        start = end = instance.date
+    start, end = (date.fromisoformat(d) if isinstance(d, str) else d for d in (start, end))
+    return instance.person_id, start, end
+
+
+@receiver(pre_save, sender=Roster)
+@receiver(pre_save, sender=RosterDay)
+@receiver(pre_save, sender=RosterDayWork)
+def planning_saving(sender, instance, raw=False, **kwargs):
+    # oude persoon/periode onthouden: die moet na het opslaan ook ververst worden
+    if raw or instance.pk is None:
+        return
+    fields = ("start_date", "end_date") if sender is Roster else ("date",)
+    old = sender.objects.only("person", *fields).filter(pk=instance.pk).first()
+    instance._planned_previous = old and _planned_range(old)
+
+
+@receiver(post_save, sender=Roster)
+@receiver(post_save, sender=RosterDay)
+@receiver(post_save, sender=RosterDayWork)
+def planning_saved(sender, instance, raw=False, **kwargs):
+    # PlannedDay volgt elke save, ook via de admin of de shell
+    if raw:
+        return
+    ranges = [_planned_range(instance)]
+    previous = getattr(instance, "_planned_previous", None)
+    if previous and previous != ranges[0]:
+        ranges.append(previous)
+    for person_id, start, end in ranges:
+        refresh_planned_days([person_id], start, end)
+
+
+@receiver(post_delete, sender=Roster)
+@receiver(post_delete, sender=RosterDay)
+@receiver(post_delete, sender=RosterDayWork)
+def planning_deleted(sender, instance, origin=None, **kwargs):
+    # alleen losse deletes: een queryset.delete() (write_day_work) ververst
+    # zelf de hele periode, en bij een verwijderde persoon gaat PlannedDay mee
+    if origin is not instance:
+        return
+    person_id, start, end = _planned_range(instance)
+    refresh_planned_days([person_id], start, end)
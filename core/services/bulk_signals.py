@@ -0,0 +1,159 @@
+"""
+Bulk acties op signals (signal_list): status, doorzetten, pauzeren tot en
+verwijderen.
+
+Werkt per chunk van signal ids (keyset op id, dus ook bruikbaar voor
+"alles wat aan de filters voldoet"). Elke chunk is één transactie met
+set-based updates; SignalHistory en nieuwe notificaties gaan via
+bulk_create. queryset.update() slaat post_save over, dus de notificatie
+voor een nieuwe behandelaar wordt hier zelf gemaakt (zie core.receivers).
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Signal, SignalNote, SignalHistory, Notification
+from core.services.notifications import build_notification, insert_notifications, is_notifiable
+
+CHUNK_SIZE = 500
+
+STATUS_ACTIONS = {
+    "set_open": "open",
+    "set_done": "done",
+    "set_snoozed": "snoozed",
+}
+ACTIONS = set(STATUS_ACTIONS) | {"reassign", "snooze_until", "delete"}
+
+
+def _chunks(qs, chunk_size):
+    ids = qs.order_by("id").values_list("id", flat=True)
+    last = 0
+    while True:
+        chunk = list(ids.filter(id__gt=last)[:chunk_size])
+        if not chunk:
+            return
+        last = chunk[-1]
+        yield chunk
+
+
+def _locked(chunk, *fields):
+    return list(
+        Signal.objects.select_for_update()
+        .filter(id__in=chunk)
+        .order_by()
+        .only("id", *fields)
+    )
+
+
+def _set_status(chunk, actor, status, now):
+    rows = [s for s in _locked(chunk, "status") if s.status != status]
+    if not rows:
+        return 0, []
+    Signal.objects.filter(id__in=[s.id for s in rows]).update(status=status, updated_at=now)
+    history = [
+        SignalHistory(signal_id=s.id, actor=actor, action="updated", changes={"status": [s.status, status]})
+        for s in rows
+    ]
+    return len(rows), history
+
+
+def _snooze_until(chunk, actor, until, now):
+    rows = [
+        s for s in _locked(chunk, "status", "active_from")
+        if s.status != "snoozed" or s.active_from != until
+    ]
+    if not rows:
+        return 0, []
+    Signal.objects.filter(id__in=[s.id for s in rows]).update(status="snoozed", active_from=until, updated_at=now)
+    new_from = timezone.localtime(until).strftime("%d-%m-%Y %H:%M")
+    history = []
+    for s in rows:
+        changes = {"active_from": [timezone.localtime(s.active_from).strftime("%d-%m-%Y %H:%M"), new_from]}
+        if s.status != "snoozed":
+            changes["status"] = [s.status, "snoozed"]
+        history.append(SignalHistory(signal_id=s.id, actor=actor, action="updated", changes=changes))
+    return len(rows), history
+
+
+def _reassign(chunk, actor, assignee, now):
+    rows = list(
+        Signal.objects.select_for_update()
+        .filter(id__in=chunk)
+        .exclude(assigned_to_id=assignee.id)
+        .select_related("assigned_to")
+        .order_by()
+    )
+    if not rows:
+        return 0, [], []
+    Signal.objects.filter(id__in=[s.id for s in rows]).update(assigned_to=assignee, updated_at=now)
+
+    history = [
+        SignalHistory(
+            signal_id=s.id,
+            actor=actor,
+            action="reassigned",
+            changes={"assigned_to": [s.assigned_to.username if s.assigned_to else "-", assignee.username]},
+        )
+        for s in rows
+    ]
+
+    # 1 notification per (signal, user), zelfde regels als notify_assignee
+    for s in rows:
+        s.assigned_to_id = assignee.id
+    candidates = [s for s in rows if is_notifiable(s, now=now)]
+    already = set(
+        Notification.objects.filter(user=assignee, signal_id__in=[s.id for s in candidates])
+        .values_list("signal_id", flat=True)
+    )
+    notifications = [build_notification(s, assignee.id) for s in candidates if s.id not in already]
+    return len(rows), history, notifications
+
+
+def _delete(chunk):
+    # zelfde effect als de on_delete regels, maar per chunk i.p.v. via de Collector
+    SignalNote.objects.filter(signal_id__in=chunk).delete()
+    SignalHistory.objects.filter(signal_id__in=chunk).delete()
+    Notification.objects.filter(signal_id__in=chunk).update(signal=None)
+    _, per_model = Signal.objects.filter(id__in=chunk).delete()
+    return per_model.get(Signal._meta.label, 0)
+
+
+def apply_bulk_action(qs, action, actor, assignee=None, until=None, chunk_size=CHUNK_SIZE):
+    """
+    Voert `action` uit op alle signals in qs. Geeft een samenvatting terug:
+    {"action", "matched", "changed", "history", "notifications", "chunks"}
+    (bij delete is "changed" het aantal verwijderde signals).
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Onbekende bulk actie: {action}")
+    if action == "reassign" and assignee is None:
+        raise ValueError("reassign vereist een behandelaar")
+    if action == "snooze_until" and until is None:
+        raise ValueError("snooze_until vereist een datum/tijd")
+
+    summary = {"action": action, "matched": 0, "changed": 0, "history": 0, "notifications": 0, "chunks": 0}
+
+    for chunk in _chunks(qs, chunk_size):
+        now = timezone.now()
+        summary["matched"] += len(chunk)
+        summary["chunks"] += 1
+        history, notifications = [], []
+
+        with transaction.atomic():
+            if action in STATUS_ACTIONS:
+                changed, history = _set_status(chunk, actor, STATUS_ACTIONS[action], now)
+            elif action == "snooze_until":
+                changed, history = _snooze_until(chunk, actor, until, now)
+            elif action == "reassign":
+                changed, history, notifications = _reassign(chunk, actor, assignee, now)
+            else:
+                changed = _delete(chunk)
+
+            SignalHistory.objects.bulk_create(history)
+            created = insert_notifications(notifications)
+
+        summary["changed"] += changed
+        summary["history"] += len(history)
+        summary["notifications"] += len(created)
+
+    return summary
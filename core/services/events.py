@@ -0,0 +1,145 @@
+"""
+Broker voor notificatie-events (Server-Sent Events, zie views.notification_stream).
+
+Staat settings.NOTIFICATION_STREAM_ENABLED uit, dan doet niets hier iets.
+
+Standaard blijft alles binnen één proces: publish() zet het event in de queue
+van elke open verbinding van die user. Draaien er meerdere ASGI workers, zet dan
+settings.NOTIFICATION_EVENTS_SOCKET_DIR; iedere worker met open verbindingen
+bindt daar een UNIX datagram socket en publish() stuurt elk event naar alle
+sockets in die map. Per user met een open verbinding zet de worker er ook een
+leeg bestand "<pid>-<user_id>.user" neer, zodat wants() zonder luisteraar
+False geeft (en de aanroeper de query voor het event overslaat).
+"""
+import asyncio
+import json
+import os
+import socket
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+QUEUE_SIZE = 100
+
+_lock = threading.Lock()
+_subscribers = {}  # user_id -> {(loop, queue), ...}
+_listener = None
+
+
+def _socket_dir():
+    path = getattr(settings, "NOTIFICATION_EVENTS_SOCKET_DIR", None)
+    return Path(path) if path else None
+
+
+def enabled():
+    return getattr(settings, "NOTIFICATION_STREAM_ENABLED", False)
+
+
+def _marker(socket_dir, pid, user_id):
+    return socket_dir / f"{pid}-{user_id}.user"
+
+
+def wants(user_id):
+    """Heeft publish() voor deze user zin (open verbinding in dit of een ander proces)?"""
+    if not enabled():
+        return False
+    socket_dir = _socket_dir()
+    if socket_dir:
+        return any(socket_dir.glob(f"*-{user_id}.user"))
+    return bool(_subscribers.get(user_id))
+
+
+def publish(user_id, event, data):
+    message = {"user_id": user_id, "event": event, "data": data}
+
+    socket_dir = _socket_dir()
+    if not socket_dir:
+        _deliver(message)
+        return
+
+    payload = json.dumps(message).encode()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        for path in socket_dir.glob("*.sock"):
+            try:
+                sock.sendto(payload, str(path))
+            except (ConnectionRefusedError, FileNotFoundError):
+                # worker is weg; opruimen
+                path.unlink(missing_ok=True)
+                for marker in socket_dir.glob(f"{path.stem}-*.user"):
+                    marker.unlink(missing_ok=True)
+            except BlockingIOError:
+                pass
+
+
+def _put(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        # trage client: events laten vallen, het volgende "unread" event corrigeert
+        pass
+
+
+def _deliver(message):
+    with _lock:
+        targets = list(_subscribers.get(message["user_id"], ()))
+
+    for loop, queue in targets:
+        try:
+            loop.call_soon_threadsafe(_put, queue, message)
+        except RuntimeError:
+            # event loop is al gesloten
+            pass
+
+
+def _on_datagram(sock):
+    try:
+        payload = sock.recv(65536)
+    except BlockingIOError:
+        return
+    _deliver(json.loads(payload))
+
+
+def _ensure_listener(loop):
+    global _listener
+
+    socket_dir = _socket_dir()
+    if _listener is not None or not socket_dir:
+        return
+
+    socket_dir.mkdir(parents=True, exist_ok=True)
+    path = socket_dir / f"{os.getpid()}.sock"
+    path.unlink(missing_ok=True)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(str(path))
+    sock.setblocking(False)
+    loop.add_reader(sock.fileno(), _on_datagram, sock)
+    _listener = sock
+
+
+@asynccontextmanager
+async def subscribe(user_id):
+    """Levert een asyncio.Queue met events voor deze user zolang de context open is."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    entry = (loop, queue)
+
+    socket_dir = _socket_dir()
+    with _lock:
+        _ensure_listener(loop)
+        _subscribers.setdefault(user_id, set()).add(entry)
+        if socket_dir:
+            _marker(socket_dir, os.getpid(), user_id).touch()
+    try:
+        yield queue
+    finally:
+        with _lock:
+            subs = _subscribers.get(user_id)
+            if subs:
+                subs.discard(entry)
+                if not subs:
+                    del _subscribers[user_id]
+                    if socket_dir:
+                        _marker(socket_dir, os.getpid(), user_id).unlink(missing_ok=True)
@@ -0,0 +1,180 @@
+"""
+Streaming exports (CSV / XLSX) voor lijsten zoals signal_list.
+
+Beide writers zijn generators die per blok rijen bytes opleveren, zodat de
+eerste bytes meteen verstuurd worden en het geheugen niet meegroeit met het
+aantal rijen. XLSX wordt zonder extra dependency geschreven: een zip naar een
+niet-seekable stream (data descriptors) met inline strings in sheet1.xml.
+"""
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+ROWS_PER_CHUNK = 500
+
+# Excel voert cellen die zo beginnen uit als formule
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_XML_ILLEGAL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    value = str(value)
+    if value.startswith(FORMULA_PREFIXES):
+        value = "'" + value
+    return value
+
+
+def _batched(rows, size=ROWS_PER_CHUNK):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def csv_chunks(header, rows):
+    # ; en BOM: zo opent (Nederlandse) Excel het bestand direct goed
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+
+    writer.writerow(header)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    for batch in _batched(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_cell(v) for v in row] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _Sink:
+    """Write-only bestand voor zipfile; geen tell/seek, dus zipfile streamt."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        # deflate buffert intern; lege blokken niet doorsturen
+        if self.parts:
+            data = b"".join(self.parts)
+            self.parts.clear()
+            yield data
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_workbook(sheet_name):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _xlsx_row(values):
+    # inline strings worden nooit als formule gelezen, dus geen _cell() escaping
+    cells = "".join(
+        f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_XML_ILLEGAL.sub("", "" if v is None else str(v)))}</t></is></c>'
+        for v in values
+    )
+    return f"<row>{cells}</row>"
+
+
+def xlsx_chunks(header, rows, sheet_name="Export"):
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", XLSX_RELS)
+        zf.writestr("xl/workbook.xml", _xlsx_workbook(sheet_name))
+        zf.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header).encode("utf-8"))
+            yield from sink.drain()
+
+            for batch in _batched(rows):
+                sheet.write("".join(_xlsx_row(row) for row in batch).encode("utf-8"))
+                yield from sink.drain()
+
+            sheet.write(b"</sheetData></worksheet>")
+    yield from sink.drain()
+
+
+def _async_chunks(chunks):
+    # onder ASGI zou Django een sync iterator eerst volledig bufferen
+    async def stream():
+        it = iter(chunks)
+        while (chunk := await sync_to_async(next)(it, None)) is not None:
+            yield chunk
+
+    return stream()
+
+
+EXPORT_FORMATS = {
+    "csv": (csv_chunks, "text/csv; charset=utf-8"),
+    "xlsx": (xlsx_chunks, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def export_response(request, fmt, filename, header, rows):
+    """StreamingHttpResponse met `rows` als CSV of XLSX (fmt: "csv"/"xlsx")."""
+    writer, content_type = EXPORT_FORMATS[fmt]
+    chunks = writer(header, rows)
+    if isinstance(request, ASGIRequest):
+        chunks = _async_chunks(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    response["X-Accel-Buffering"] = "no"
+    return response
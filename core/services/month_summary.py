@@ -0,0 +1,102 @@
+"""
+Maandtotalen van één persoon voor person_detail: uren per (hoofd)werkpakket
+en de maandstatistiek (werkbare dagen, gepland, gewerkt), plus de
+jaartotalen.
+
+De maand- en jaarcijfers komen uit PlannedDay, het gedeelde aggregaat per
+persoon per dag. core.receivers en de bulk-schrijvers houden het per geraakte
+periode bij, dus het klopt in elke worker zonder cache-invalidatie, en
+maandnavigatie is een indexed GROUP BY i.p.v. het grid opnieuw doorrekenen.
+De uren per werkpakket zijn één SUM per maand over RosterDayWork (index
+uniq_person_date_wp). Die SUM leest de codes live, zodat een gewijzigde
+WorkPackage direct zichtbaar is.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+
+from core.models import PlannedDay, RosterDayWork
+from core.services.planned_days import planned_totals
+
+ZERO = Decimal("0")
+CENTS = Decimal("0.01")
+
+
+def _hours(value):
+    # SUM in SQLite verliest de decimalen; zelfde weergave als de DecimalFields
+    return value.quantize(CENTS) if value else ZERO
+
+
+def _work_totals(person_id, month_start, month_end):
+    rows = (
+        RosterDayWork.objects.filter(person_id=person_id, date__gte=month_start, date__lte=month_end)
+        .order_by()
+        .values_list("work_package__code")
+        .annotate(total=Sum("hours"))
+    )
+
+    month_totals = {}
+    month_parent_totals = {}
+    for code, total in rows:
+        parent_code = (code or "").split(".")[0]
+        month_totals[code] = _hours(total)
+        month_parent_totals[parent_code] = month_parent_totals.get(parent_code, ZERO) + _hours(total)
+
+    month_totals_by_parent = {}
+    for code, total in sorted(month_totals.items()):
+        month_totals_by_parent.setdefault(code.split(".")[0], []).append({"code": code, "total": total})
+
+    return {
+        "month_totals": dict(sorted(month_totals.items())),
+        "month_parent_totals": dict(sorted(month_parent_totals.items())),
+        "month_totals_by_parent": dict(sorted(month_totals_by_parent.items())),
+        "month_grand_total": sum(month_parent_totals.values(), ZERO),
+    }
+
+
+def _month_stats(person_id, month_start, month_end):
+    # dagen zonder PlannedDay rij zijn "work" met 0 uur
+    rows = (
+        PlannedDay.objects.filter(person_id=person_id, date__gte=month_start, date__lte=month_end)
+        .order_by()
+        .values("status")
+        .annotate(
+            days=Count("id"),
+            planned=Sum("planned_hours"),
+            actual=Sum("actual_hours"),
+            workable=Count("id", filter=Q(planned_hours__gt=0)),
+        )
+    )
+    stats = {
+        "workable_days": 0,
+        "planned_hours_total": ZERO,
+        "actual_hours_total": ZERO,
+        "status_counts": {},
+    }
+    other_days = 0
+    for row in rows:
+        stats["planned_hours_total"] += _hours(row["planned"])
+        stats["actual_hours_total"] += _hours(row["actual"])
+        if row["status"] == "work":
+            stats["workable_days"] = row["workable"]
+        else:
+            stats["status_counts"][row["status"]] = row["days"]
+            other_days += row["days"]
+
+    work_days = (month_end - month_start).days + 1 - other_days
+    if work_days:
+        stats["status_counts"]["work"] = work_days
+    return stats
+
+
+def month_summary(person_id, month_start, month_end):
+    """
+    {"month_totals", "month_parent_totals", "month_totals_by_parent",
+     "month_grand_total", "month_stats", "year_totals"} voor person_detail.
+    """
+    summary = _work_totals(person_id, month_start, month_end)
+    summary["month_stats"] = _month_stats(person_id, month_start, month_end)
+    year = month_start.year
+    summary["year_totals"] = {"year": year, **planned_totals(person_id, date(year, 1, 1), date(year, 12, 31))}
+    return summary
@@ -1,40 +1,169 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
 from django.utils import timezone
-from django.db import transaction
 
-from core.models import Signal, Notification
+from core.models import Signal, Notification, NotificationCounter
+from core.services import events
+
+
+def build_notification(signal, user_id):
+    return Notification(
+        user_id=user_id,
+        signal=signal,
+        title=f"Melding: {signal.title}",
+        body=signal.body or "",
+        url=f"/notifications/?open={signal.id}",
+    )
+
+
+def announce(notifications):
+    # nieuwe notificaties naar open SSE verbindingen, pas na commit
+    def send():
+        for n in notifications:
+            if events.wants(n.user_id):
+                events.publish(n.user_id, "notification", {"id": n.id, "title": n.title, "url": n.url})
+
+    transaction.on_commit(send)
+
+
+def insert_notifications(notifications):
+    """
+    bulk_create met ignore_conflicts op uniq_notification_signal_user. Alleen
+    de rijen die echt zijn ingevoegd tellen mee in NotificationCounter en gaan
+    naar SSE; was notify_assignee of de scheduler net eerder, dan wordt die
+    (signal, user) overgeslagen. Draait binnen de transactie van de aanroeper.
+    """
+    if not notifications:
+        return []
+    keys = {(n.signal_id, n.user_id) for n in notifications}
+    signal_ids = {signal_id for signal_id, _ in keys}
+    existing = set(Notification.objects.filter(signal_id__in=signal_ids).values_list("id", flat=True))
+
+    # ignore_conflicts zet geen primary keys; daarom de nieuwe rijen teruglezen
+    Notification.objects.bulk_create(notifications, ignore_conflicts=True)
+    created = [
+        n for n in Notification.objects.filter(signal_id__in=signal_ids).order_by("id")
+        if n.id not in existing and (n.signal_id, n.user_id) in keys
+    ]
+
+    for user_id, delta in Counter(n.user_id for n in created).items():
+        NotificationCounter.bump(user_id, delta)
+    announce(created)
+    return created
+
+
+def is_notifiable(signal, now=None):
+    # zelfde regels als voorheen in ensure_notifications_for_user
+    if not signal.notify or not signal.assigned_to_id or signal.status == "done":
+        return False
+    now = now or timezone.now()
+    return signal.active_from <= now
 
 
 @transaction.atomic
-def ensure_notifications_for_user(user):
-    if not user or not user.is_authenticated:
-        return
+def notify_assignee(signal, now=None):
+    """
+    Maakt de notificatie voor de huidige behandelaar aan op het moment dat
+    de oorzaak ontstaat (aanmaken, wijzigen, doorzetten van een Signal).
+
+    Signals met een active_from in de toekomst worden hier overgeslagen;
+    die worden opgepakt door `generate_notifications` zodra ze actief zijn.
+    """
+    if not is_notifiable(signal, now=now):
+        return None
 
-    now = timezone.localtime(timezone.now())
+    # 1 notification per (signal, user)
+    if Notification.objects.filter(signal=signal, user_id=signal.assigned_to_id).exists():
+        return None
 
-    eligible = (
+    n = build_notification(signal, signal.assigned_to_id)
+    try:
+        with transaction.atomic():
+            n.save()
+    except IntegrityError:
+        # tegelijk aangemaakt door de scheduler of generate_notifications
+        return None
+    NotificationCounter.bump(n.user_id, 1)
+    announce([n])
+    return n
+
+
+def notifiable_signals():
+    return (
         Signal.objects
-        .filter(
-            notify=True,
-            assigned_to=user,
-            active_from__lte=now,
-        )
+        .filter(notify=True, assigned_to__isnull=False)
         .exclude(status="done")
     )
 
-    # signals zonder notification voor deze user
-    missing = eligible.exclude(notifications__user=user)
 
-    if not missing.exists():
-        return
+def upcoming_signals(after, until, changed_since=None):
+    """(id, active_from) van signals die in (after, until] actief worden."""
+    qs = notifiable_signals().filter(active_from__gt=after, active_from__lte=until)
+    if changed_since:
+        qs = qs.filter(updated_at__gte=changed_since)
+    return qs.order_by().values_list("id", "active_from")
+
+
+def due_signals(now=None, since=None, signal_ids=None):
+    """
+    Signals die een notificatie moeten krijgen maar nog geen hebben
+    voor hun huidige behandelaar (anti-join op Notification).
+    """
+    now = now or timezone.now()
 
-    to_create = []
-    for s in missing:
-        to_create.append(Notification(
-            user=user,
-            signal=s,
-            title=f"Melding: {s.title}",
-            body=s.body or "",
-            url=f"/notifications/?open={s.id}",
+    qs = (
+        notifiable_signals()
+        .filter(active_from__lte=now)
+        .filter(~Exists(
+            Notification.objects.filter(signal=OuterRef("pk"), user=OuterRef("assigned_to"))
         ))
+    )
+    if since:
+        qs = qs.filter(active_from__gte=since)
+    if signal_ids is not None:
+        qs = qs.filter(id__in=signal_ids)
+    return qs
+
+
+def create_due_notifications(now=None, since=None, signal_ids=None, batch_size=1000, dry_run=False):
+    """
+    Set-based variant van het oude per-signal loopje: per batch één query
+    op de anti-join en één bulk_create, elk in een eigen (korte) transactie
+    zodat web requests niet lang op de SQLite write lock wachten.
+    """
+    now = now or timezone.now()
+    # (active_from, id) volgt de partial index signal_notify_due_idx
+    qs = (
+        due_signals(now=now, since=since, signal_ids=signal_ids)
+        .order_by("active_from", "id")
+        .only("id", "title", "body", "active_from", "assigned_to_id")
+    )
+
+    stats = {"created": 0, "batches": 0}
+    last = None
+
+    while True:
+        page = qs
+        if last is not None:
+            # active_from__gte geeft SQLite een startpunt in de index
+            page = qs.filter(active_from__gte=last.active_from).filter(
+                Q(active_from__gt=last.active_from) | Q(id__gt=last.id)
+            )
+        batch = list(page[:batch_size])
+        if not batch:
+            break
+        last = batch[-1]
+        stats["batches"] += 1
+
+        if dry_run:
+            stats["created"] += len(batch)
+            continue
+
+        with transaction.atomic():
+            created = insert_notifications([build_notification(s, s.assigned_to_id) for s in batch])
+
+        stats["created"] += len(created)
 
-    Notification.objects.bulk_create(to_create, ignore_conflicts=True)
+    return stats
@@ -0,0 +1,127 @@
+"""
+PlannedDay: de uitkomst van rooster + dag-override + werkpakket-uren per
+persoon per dag, als gewone tabel.
+
+Na elke save/delete van een Roster, RosterDay of RosterDayWork (views én
+admin) ververst core.receivers alleen de geraakte periode
+(refresh_planned_days). Bulk schrijven (timesheet) ververst zelf.
+Migratie 0027 vult de tabel voor bestaande data; na een import of loaddata
+bouwt `manage.py rebuild_planned_days` alles opnieuw op.
+
+Maand- en jaartotalen zijn daarmee één SUM over (person, date)
+(planned_totals, via de index van uniq_person_date_planned).
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max, Min, Sum
+
+from core.models import PlannedDay, Roster, RosterDay, RosterDayWork
+from core.services.roster_calendar import RosterCalendar, resolve_day
+
+ZERO = Decimal("0")
+CENTS = Decimal("0.01")
+
+
+def _as_date(value):
+    # de views zetten POST strings direct op het model
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def planned_rows(calendar, overrides, work_totals, person_ids, start, end):
+    """
+    (person_id, date, status, planned, actual, work_hours) voor elke dag in
+    start..end met een rooster, een RosterDay of werkpakket-uren.
+    overrides/work_totals: {(person_id, date): RosterDay / Decimal}.
+    """
+    for person_id, d, roster, planned_base in calendar.iter_days(start, end, person_ids):
+        override = overrides.get((person_id, d))
+        work_hours = work_totals.get((person_id, d))
+        if roster is None and override is None and work_hours is None:
+            continue
+        status, planned, actual, _ = resolve_day(planned_base, override)
+        yield person_id, d, status, planned, actual, work_hours or ZERO
+
+
+def refresh_planned_days(person_ids, start, end):
+    """Herberekent PlannedDay voor person_ids in start..end (inclusief)."""
+    person_ids = list(person_ids)
+    start, end = _as_date(start), _as_date(end)
+    if not person_ids or start > end:
+        return 0
+
+    calendar = RosterCalendar.for_persons(person_ids, start, end)
+    overrides = {
+        (rd.person_id, rd.date): rd
+        for rd in RosterDay.objects.filter(person_id__in=person_ids, date__gte=start, date__lte=end)
+    }
+    work_totals = {
+        (person_id, d): total
+        for person_id, d, total in RosterDayWork.objects.filter(
+            person_id__in=person_ids, date__gte=start, date__lte=end
+        ).order_by().values_list("person_id", "date").annotate(total=Sum("hours"))
+    }
+    rows = [
+        PlannedDay(person_id=person_id, date=d, status=status, planned_hours=planned, actual_hours=actual, work_hours=work)
+        for person_id, d, status, planned, actual, work in planned_rows(
+            calendar, overrides, work_totals, person_ids, start, end
+        )
+    ]
+
+    with transaction.atomic():
+        PlannedDay.objects.filter(person_id__in=person_ids, date__gte=start, date__lte=end).delete()
+        PlannedDay.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _extent(person_ids):
+    starts, ends = [], []
+    for qs, start_field, end_field in (
+        (Roster.objects, "start_date", "end_date"),
+        (RosterDay.objects, "date", "date"),
+        (RosterDayWork.objects, "date", "date"),
+    ):
+        row = qs.filter(person_id__in=person_ids).aggregate(start=Min(start_field), end=Max(end_field))
+        if row["start"]:
+            starts.append(row["start"])
+            ends.append(row["end"])
+    return min(starts), max(ends)
+
+
+def rebuild_planned_days(chunk_size=200):
+    """
+    Bouwt PlannedDay opnieuw op. Per chunk personen in één transactie (oude
+    rijen weg + nieuwe erin), zodat lezers nooit een lege of halve tabel
+    zien. Geeft (dagen, personen) terug.
+    """
+    person_ids = sorted(
+        set(Roster.objects.values_list("person_id", flat=True))
+        | set(RosterDay.objects.values_list("person_id", flat=True).distinct())
+        | set(RosterDayWork.objects.values_list("person_id", flat=True).distinct())
+    )
+    stale = sorted(set(PlannedDay.objects.values_list("person_id", flat=True).distinct()) - set(person_ids))
+
+    rows = 0
+    for i in range(0, len(person_ids), chunk_size):
+        chunk = person_ids[i:i + chunk_size]
+        start, end = _extent(chunk)
+        with transaction.atomic():
+            PlannedDay.objects.filter(person_id__in=chunk).exclude(date__gte=start, date__lte=end).delete()
+            rows += refresh_planned_days(chunk, start, end)
+    # personen zonder rooster of dagen meer
+    for i in range(0, len(stale), chunk_size):
+        PlannedDay.objects.filter(person_id__in=stale[i:i + chunk_size]).delete()
+
+    return rows, len(person_ids)
+
+
+def planned_totals(person_id, start, end):
+    """{"planned", "actual", "worked"} van één persoon over start..end (inclusief)."""
+    row = PlannedDay.objects.filter(person_id=person_id, date__gte=start, date__lte=end).aggregate(
+        planned=Sum("planned_hours"),
+        actual=Sum("actual_hours"),
+        worked=Sum("work_hours"),
+    )
+    # SUM in SQLite verliest de decimalen; zelfde weergave als de DecimalFields
+    return {key: (value or ZERO).quantize(CENTS) for key, value in row.items()}
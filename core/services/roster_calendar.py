@@ -0,0 +1,148 @@
+"""
+Geplande uren uit roosters (Roster) voor willekeurige personen en periodes.
+
+Een rooster dekt start_date..end_date met een twee-weken patroon: week A/B
+wisselt elke 7 dagen vanaf cycle_start_date (of start_date). Overlappen er
+toch roosters, dan geldt het rooster met de laatste start_date (bij gelijke
+start het laagste id), net als in person_detail.
+
+RosterCalendar bouwt per persoon één gesorteerde interval-index en loopt een
+periode in één keer door (sweep met een heap), i.p.v. per dag alle roosters
+af te gaan. De uren per rooster staan vooraf in één tuple van 14 Decimals.
+"""
+import heapq
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+
+from core.models import Roster
+
+ZERO = Decimal("0")
+OFF_STATUSES = ("sick", "vacation", "off")
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+HOUR_FIELDS = tuple(f"{d}_a_hours" for d in DAYS) + tuple(f"{d}_b_hours" for d in DAYS)
+
+
+class _Entry:
+    __slots__ = ("roster", "start", "end", "anchor", "hours", "rank")
+
+    def __init__(self, roster):
+        self.roster = roster
+        self.start = roster.start_date.toordinal()
+        self.end = roster.end_date.toordinal()
+        self.anchor = (roster.cycle_start_date or roster.start_date).toordinal()
+        self.hours = tuple(getattr(roster, f) for f in HOUR_FIELDS)
+        # heap: laagste rank wint = laatste start, dan laagste id (volgorde van order_by("-start_date"))
+        self.rank = (-self.start, roster.id or 0)
+
+    def hours_on(self, ordinal):
+        week_index = ((ordinal - self.anchor) // 7) % 2  # 0=A, 1=B
+        # date.fromordinal(1) is een maandag, dus (ordinal - 1) % 7 == weekday()
+        return self.hours[week_index * 7 + (ordinal - 1) % 7]
+
+
+def resolve_day(planned_base, override=None):
+    """
+    (status, planned, actual, note) voor één dag: rooster-uren met de
+    RosterDay override erover, zoals in de person_detail kalender.
+    """
+    status = override.status if override else "work"
+    planned = override.planned_hours if (override and override.planned_hours is not None) else planned_base
+    if override and override.actual_hours is not None:
+        actual = override.actual_hours
+    else:
+        actual = ZERO if status in OFF_STATUSES else planned
+    note = override.note if override else ""
+    return status, planned, actual, note
+
+
+class RosterCalendar:
+    """
+    calendar = RosterCalendar.for_persons(ids, start, end)
+    calendar.planned(person_id, day)               -> Decimal
+    calendar.planned_range(person_id, start, end)  -> [(date, Decimal)]
+    calendar.iter_days(start, end)                 -> (person_id, date, roster|None, Decimal)
+    """
+
+    def __init__(self, rosters):
+        self._index = {}
+        for r in rosters:
+            self._index.setdefault(r.person_id, []).append(_Entry(r))
+        self._starts = {}
+        for person_id, entries in self._index.items():
+            entries.sort(key=lambda e: (e.start, -e.rank[1]))
+            self._starts[person_id] = [e.start for e in entries]
+
+    @classmethod
+    def for_persons(cls, person_ids, start, end):
+        """Eén query voor alle roosters van person_ids die start..end raken."""
+        rosters = Roster.objects.filter(
+            person_id__in=list(person_ids), start_date__lte=end, end_date__gte=start
+        )
+        return cls(rosters)
+
+    @classmethod
+    def for_person(cls, person, start, end):
+        return cls(Roster.objects.filter(person=person, start_date__lte=end, end_date__gte=start))
+
+    def person_ids(self):
+        return self._index.keys()
+
+    def rosters(self, person_id):
+        """Roosters van de persoon, nieuwste start eerst (zoals Roster.Meta.ordering)."""
+        return [e.roster for e in sorted(self._index.get(person_id, ()), key=lambda e: e.rank)]
+
+    def _entry_for(self, person_id, ordinal):
+        entries = self._index.get(person_id)
+        if not entries:
+            return None
+        i = bisect_right(self._starts[person_id], ordinal)
+        # zonder overlap is dit de eerste kandidaat; anders terug tot er één dekt
+        while i:
+            i -= 1
+            if entries[i].end >= ordinal:
+                return entries[i]
+        return None
+
+    def roster_for(self, person_id, day):
+        entry = self._entry_for(person_id, day.toordinal())
+        return entry.roster if entry else None
+
+    def planned(self, person_id, day):
+        ordinal = day.toordinal()
+        entry = self._entry_for(person_id, ordinal)
+        return entry.hours_on(ordinal) if entry else ZERO
+
+    def _sweep(self, person_id, start, end):
+        entries = self._index.get(person_id, ())
+        first, last = start.toordinal(), end.toordinal()
+        i = bisect_right(self._starts.get(person_id, ()), first)
+        heap = [(e.rank, n, e) for n, e in enumerate(entries[:i]) if e.end >= first]
+        heapq.heapify(heap)
+
+        for ordinal in range(first, last + 1):
+            while i < len(entries) and entries[i].start <= ordinal:
+                heapq.heappush(heap, (entries[i].rank, i, entries[i]))
+                i += 1
+            while heap and heap[0][2].end < ordinal:
+                heapq.heappop(heap)
+            yield ordinal, (heap[0][2] if heap else None)
+
+    def planned_range(self, person_id, start, end):
+        return [
+            (date.fromordinal(ordinal), entry.hours_on(ordinal) if entry else ZERO)
+            for ordinal, entry in self._sweep(person_id, start, end)
+        ]
+
+    def iter_days(self, start, end, person_ids=None):
+        """Alle (person_id, dag, rooster, uren) in start..end, per persoon op datum."""
+        for person_id in (self._index.keys() if person_ids is None else person_ids):
+            for ordinal, entry in self._sweep(person_id, start, end):
+                yield (
+                    person_id,
+                    date.fromordinal(ordinal),
+                    entry.roster if entry else None,
+                    entry.hours_on(ordinal) if entry else ZERO,
+                )
+
@@ -0,0 +1,147 @@
+"""
+Zoeken.
+
+- Personen: genormaliseerde prefix-tokens in PersonSearchToken (naam, email,
+  woonplaats, telefoon), gedeeld door alle lijsten via search_people(). Van
+  elk token staan ook de suffixen (vanaf SUFFIX_MIN_LENGTH tekens) in de
+  tabel, zodat "erg" of de laatste cijfers van een telefoonnummer via
+  dezelfde index als substring matchen.
+- Signals: de SQLite FTS5 tabel core_signal_fts (zie migratie 0021). Op
+  databases zonder FTS5 (of zonder de tabel) valt het terug op icontains
+  voor titel/tekst en search_people() voor de naam.
+"""
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+
+from core.models import Person, PersonSearchToken
+
+FTS_TABLE = "core_signal_fts"
+TOKEN_MAX_LENGTH = 100
+SUFFIX_MIN_LENGTH = 3
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_available = None
+
+
+def normalize(text):
+    """"Zoë van der Bérg" -> "zoe van der berg" (accenten weg, lowercase)."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return text.lower()
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_RE.findall(normalize(text)) if t != "_"]
+
+
+def person_tokens(first_name="", last_name="", email="", city="", phone=""):
+    tokens = set()
+    for value in (first_name, last_name, email, city):
+        tokens.update(tokenize(value))
+    # "vanderberg" / "van der berg": ook de achternaam aan elkaar
+    last = "".join(tokenize(last_name))
+    if last:
+        tokens.add(last)
+    digits = re.sub(r"\D", "", phone or "")
+    if digits:
+        tokens.add(digits)
+    # suffixen: "berg" is een prefix van "berg" uit "vanderberg", "5678" van
+    # "5678" uit "0612345678"
+    tokens.update(t[i:] for t in list(tokens) for i in range(1, len(t) - SUFFIX_MIN_LENGTH + 1))
+    return {t[:TOKEN_MAX_LENGTH] for t in tokens}
+
+
+def index_person(person):
+    """Zet de zoektokens van één persoon gelijk aan zijn huidige velden."""
+    wanted = person_tokens(person.first_name, person.last_name, person.email, person.city, person.phone)
+    with transaction.atomic():
+        current = set(PersonSearchToken.objects.filter(person=person).values_list("token", flat=True))
+        if current - wanted:
+            PersonSearchToken.objects.filter(person=person, token__in=current - wanted).delete()
+        PersonSearchToken.objects.bulk_create(
+            [PersonSearchToken(person=person, token=t) for t in wanted - current]
+        )
+
+
+def _prefix_range(token):
+    # token >= "berg" AND token < "berg\uffff": range scan op person_search_token_idx
+    return {"token__gte": token, "token__lt": token + "\uffff"}
+
+
+def search_people(qs, q, person_field="id"):
+    """
+    Filtert qs op zoekterm q: elk woord moet een prefix zijn van een token (of
+    een suffix daarvan) van de persoon, dus ergens in naam, email, woonplaats
+    of telefoon staan. person_field is het pad naar Person.id in qs (bv.
+    "person_id" voor signals).
+    """
+    tokens = set(tokenize(q))
+    if not tokens:
+        return qs
+    match = Q()
+    for token in tokens:
+        matches = PersonSearchToken.objects.filter(**_prefix_range(token[:TOKEN_MAX_LENGTH])).values("person_id")
+        match &= Q(**{f"{person_field}__in": matches})
+    return qs.filter(match)
+
+
+def fts_available():
+    global _available
+    if _available is None:
+        if connection.vendor != "sqlite":
+            _available = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+                )
+                _available = cursor.fetchone() is not None
+    return _available
+
+
+def match_query(q):
+    # elke term als prefix, alle termen verplicht: "van der be" -> "van"* "der"* "be"*
+    tokens = _TOKEN_RE.findall(q or "")
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+class FtsRank(Func):
+    """
+    bm25 rank van de FTS-rij van deze signal. Gecorreleerd via F("pk") i.p.v.
+    een vaste "core_signal.id", zodat het ook klopt als de query een alias
+    krijgt of als subquery draait (bulk actie, export).
+    """
+    output_field = FloatField()
+
+    def __init__(self, match):
+        super().__init__(Value(match), F("pk"))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (match_sql, match_params), (pk_sql, pk_params) = (
+            compiler.compile(expression) for expression in self.get_source_expressions()
+        )
+        sql = f"(SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH {match_sql} AND {FTS_TABLE}.rowid = {pk_sql})"
+        return sql, [*match_params, *pk_params]
+
+
+def search_signals(qs, q):
+    """
+    Filtert qs op zoekterm q. Geeft (qs, ranked) terug; bij ranked=True heeft
+    qs een annotatie `search_rank` (bm25, lager = beter).
+    """
+    match = match_query(q)
+
+    if not match or not fts_available():
+        text = Q(title__icontains=q) | Q(body__icontains=q)
+        if tokenize(q):
+            text |= Q(person_id__in=search_people(Person.objects.all(), q).values("id"))
+        return qs.filter(text), False
+
+    qs = qs.filter(
+        id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    ).annotate(search_rank=FtsRank(match))
+    return qs, True
@@ -0,0 +1,126 @@
+"""
+Filters en facet-tellingen voor de personenlijsten (student_list, person_list).
+
+Per facet (status, locatie, organisatie, baangarantie, praktijkroute) één
+GROUP BY query onder alle ándere actieve filters, zodat elke optie in de
+dropdown laat zien hoeveel studenten je na die keuze overhoudt. Resultaten
+staan kort in de cache; een wijziging aan een StudentProfile verhoogt de
+versie in de cache key (zie core.receivers), waarmee alles vervalt; een
+gewijzigde Person ook (type/naam tellen mee in person_type_counts).
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from core.services.search import search_people
+
+FACETS_TTL = 60
+VERSION_KEY = "student_facets:version"
+
+# facet -> (filter key, veld)
+FACETS = {
+    "status": ("status", "student_profile__status"),
+    "location": ("location_id", "student_profile__location_id"),
+    "org": ("organization_id", "student_profile__organization_id"),
+    "job_guarantee": ("job_guarantee", "student_profile__job_guarantee"),
+    "praktijkroute": ("praktijkroute", "student_profile__praktijkroute"),
+}
+
+
+def student_filters(params):
+    return {
+        "q": params.get("q", "").strip(),
+        "status": params.get("status", "").strip(),
+        "location_id": params.get("location", "").strip(),
+        "organization_id": params.get("org", "").strip(),
+        "job_guarantee": params.get("job_guarantee", "").strip(),
+        "praktijkroute": params.get("praktijkroute", "").strip(),
+    }
+
+
+def filter_students(qs, filters, skip=None):
+    """Past de student_list filters toe, behalve filter key `skip`."""
+    f = {k: v for k, v in filters.items() if k != skip}
+
+    if f.get("q"):
+        qs = search_people(qs, f["q"])
+
+    if f.get("status"):
+        qs = qs.filter(student_profile__status=f["status"])
+
+    if f.get("location_id", "").isdigit():
+        qs = qs.filter(student_profile__location_id=int(f["location_id"]))
+
+    if f.get("organization_id", "").isdigit():
+        qs = qs.filter(student_profile__organization_id=int(f["organization_id"]))
+
+    if f.get("job_guarantee") in ("0", "1"):
+        qs = qs.filter(student_profile__job_guarantee=(f["job_guarantee"] == "1"))
+
+    if f.get("praktijkroute") in ("0", "1"):
+        qs = qs.filter(student_profile__praktijkroute=(f["praktijkroute"] == "1"))
+
+    return qs
+
+
+def _version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_student_facets():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def _cache_key(filters):
+    raw = json.dumps(filters, sort_keys=True)
+    return f"student_facets:{_version()}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def student_facets(qs, filters):
+    """
+    {facet: {waarde: aantal}}; booleans als "1"/"0" (zoals de GET params),
+    locatie/organisatie op id. Lege waarden (geen profiel/locatie) tellen niet mee.
+    """
+    key = _cache_key(filters)
+    facets = cache.get(key)
+    if facets is not None:
+        return facets
+
+    facets = {}
+    for name, (filter_key, field) in FACETS.items():
+        rows = (
+            filter_students(qs, filters, skip=filter_key)
+            .order_by()
+            .values_list(field)
+            .annotate(n=Count("id"))
+        )
+        counts = {}
+        for value, n in rows:
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = "1" if value else "0"
+            counts[value] = n
+        facets[name] = counts
+
+    cache.set(key, facets, FACETS_TTL)
+    return facets
+
+
+def person_type_counts(qs, q=""):
+    """{"student": n, "employee": m} onder zoekterm q, één GROUP BY."""
+    key = _cache_key({"person_type": True, "q": q})
+    counts = cache.get(key)
+    if counts is not None:
+        return counts
+
+    if q:
+        qs = search_people(qs, q)
+    counts = dict(qs.order_by().values_list("person_type").annotate(n=Count("id")))
+    cache.set(key, counts, FACETS_TTL)
+    return counts
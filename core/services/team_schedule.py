@@ -0,0 +1,102 @@
+"""
+Teamrooster: status en gepland/werkelijk per persoon per dag voor een hele
+locatie of organisatie.
+
+Altijd drie queries, los van het aantal personen en dagen: roosters
+(RosterCalendar), dag-overrides (RosterDay) en werkpakket-uren per dag
+(RosterDayWork, opgeteld in SQL). De cellen worden hier al klaargezet
+(label, css class, tooltip), zodat de template per cel alleen hoeft te printen.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from core.models import RosterDay, RosterDayWork
+from core.services.roster_calendar import RosterCalendar, resolve_day
+
+ZERO = Decimal("0")
+
+# korte code in de cel voor alles behalve gewoon werken
+STATUS_LABELS = {
+    "sick": "Z",
+    "vacation": "V",
+    "off": "-",
+    "swapped": "G",
+    "absent": "A",
+    "other": "?",
+}
+STATUS_NAMES = dict(RosterDay.STATUS_CHOICES)
+
+
+def hours_label(value):
+    """Decimal("7.50") -> "7.5", Decimal("8.00") -> "8"."""
+    text = f"{value:f}"
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+
+def _cell(status, planned, actual, work_hours):
+    if status == "work":
+        label = hours_label(actual) if (planned or actual) else ""
+        css = "work" if planned else "empty"
+    else:
+        label = STATUS_LABELS.get(status, "?")
+        css = status
+    title = f"{STATUS_NAMES.get(status, status)} • gepland {hours_label(planned)} • gewerkt {hours_label(actual)}"
+    if work_hours:
+        title += f" • werkpakketten {hours_label(work_hours)}"
+    return label, css, title
+
+
+def build_team_schedule(people, start, end):
+    """
+    people: lijst Person objecten (al geladen, in weergavevolgorde).
+    Geeft (days, rows, day_totals) terug:
+      days       = [date, ...]
+      rows       = [{"person", "cells": [(label, css, title), ...], "planned", "actual", "worked"}]
+      day_totals = [{"working": n, "actual": Decimal}, ...] per dag
+    """
+    person_ids = [p.id for p in people]
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    if not person_ids:
+        return days, [], []
+
+    calendar = RosterCalendar.for_persons(person_ids, start, end)
+    overrides = {
+        (rd.person_id, rd.date): rd
+        for rd in RosterDay.objects.filter(person_id__in=person_ids, date__gte=start, date__lte=end)
+        .only("person_id", "date", "status", "planned_hours", "actual_hours", "note")
+    }
+    work_totals = {
+        (person_id, d): total
+        for person_id, d, total in RosterDayWork.objects.filter(
+            person_id__in=person_ids, date__gte=start, date__lte=end
+        ).order_by().values_list("person_id", "date").annotate(total=Sum("hours"))
+    }
+
+    day_totals = [{"working": 0, "actual": ZERO} for _ in days]
+    rows = []
+    for person in people:
+        cells = []
+        planned_sum = actual_sum = worked_sum = ZERO
+        for i, (d, planned_base) in enumerate(calendar.planned_range(person.id, start, end)):
+            status, planned, actual, _ = resolve_day(planned_base, overrides.get((person.id, d)))
+            work_hours = work_totals.get((person.id, d), ZERO)
+            cells.append(_cell(status, planned, actual, work_hours))
+
+            planned_sum += planned
+            actual_sum += actual
+            worked_sum += work_hours
+            if status == "work" and planned > 0:
+                day_totals[i]["working"] += 1
+            day_totals[i]["actual"] += actual
+
+        rows.append({
+            "person": person,
+            "cells": cells,
+            "planned": planned_sum,
+            "actual": actual_sum,
+            "worked": worked_sum,
+        })
+
+    return days, rows, day_totals
@@ -0,0 +1,237 @@
+"""
+Uren wegschrijven als één set i.p.v. per dag/pakket: RosterDay en
+RosterDayWork via upserts op hun unieke constraints (uniq_person_date_rosterday,
+uniq_person_date_wp) en één DELETE voor de pakketten die leeg of 0 zijn
+gemaakt.
+
+- roster_day_save: één dag van één persoon (write_day_work).
+- timesheet_save: een week/maand voor één of meer personen als JSON;
+  parse_timesheet valideert alles in het geheugen (twee queries: personen en
+  werkpakketten), apply_timesheet schrijft het in één transactie en ververst
+  PlannedDay voor de geraakte personen en periode.
+"""
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import Person, RosterDay, RosterDayWork, WorkPackage
+from core.services.planned_days import refresh_planned_days
+
+BATCH_SIZE = 500
+DELETE_PARAMS = 2000  # SQL parameters per DELETE, ruim onder de SQLite limiet
+MAX_ENTRIES = 20000  # ± een maand voor 600 personen
+
+DAY_FIELDS = ("status", "planned_hours", "actual_hours", "note")
+STATUSES = {value for value, _ in RosterDay.STATUS_CHOICES}
+MAX_HOURS = Decimal("99.99")  # DecimalField(max_digits=4, decimal_places=2)
+CENTS = Decimal("0.01")
+
+
+def unknown_work_packages(work_package_ids):
+    """De ids uit work_package_ids waarvoor geen WorkPackage bestaat (gesorteerd)."""
+    wanted = set(work_package_ids)
+    if not wanted:
+        return []
+    known = set(WorkPackage.objects.filter(id__in=wanted).values_list("id", flat=True))
+    return sorted(wanted - known)
+
+
+def _delete_batches(terms):
+    batch, params = Q(), 0
+    for term, size in terms:
+        if params and params + size > DELETE_PARAMS:
+            yield batch
+            batch, params = Q(), 0
+        batch |= term
+        params += size
+    if params:
+        yield batch
+
+
+def write_day_work(entries):
+    """
+    entries: {(person_id, date, work_package_id): Decimal of None}.
+    None of 0 = pakket weghalen, anders uren zetten (insert of update).
+    Geeft (geschreven, verwijderd) terug.
+    """
+    upserts = []
+    cleared = {}
+    for (person_id, d, wp_id), hours in entries.items():
+        if hours:
+            upserts.append(RosterDayWork(person_id=person_id, date=d, work_package_id=wp_id, hours=hours))
+        else:
+            cleared.setdefault((person_id, d), set()).add(wp_id)
+
+    deleted = 0
+    if cleared:
+        # personen die op dezelfde dag dezelfde pakketten leegmaken delen één term
+        groups = {}
+        for (person_id, d), wp_ids in cleared.items():
+            groups.setdefault((d, tuple(sorted(wp_ids))), []).append(person_id)
+        terms = [
+            (Q(date=d, work_package_id__in=wp_ids, person_id__in=person_ids), 1 + len(wp_ids) + len(person_ids))
+            for (d, wp_ids), person_ids in groups.items()
+        ]
+        for match in _delete_batches(terms):
+            deleted += RosterDayWork.objects.filter(match).delete()[0]
+
+    if upserts:
+        RosterDayWork.objects.bulk_create(
+            upserts,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["person", "date", "work_package"],
+            update_fields=["hours"],
+        )
+    return len(upserts), deleted
+
+
+def _hours(value):
+    """Decimal of None uit een JSON waarde; ValueError bij iets anders."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError("geen getal")
+    try:
+        hours = Decimal(str(value).strip().replace(",", "."))
+    except InvalidOperation:
+        raise ValueError("geen getal")
+    if not hours.is_finite() or hours != hours.quantize(CENTS):
+        raise ValueError("max. 2 decimalen")
+    if hours < 0 or hours > MAX_HOURS:
+        raise ValueError(f"moet tussen 0 en {MAX_HOURS} liggen")
+    return hours
+
+
+def _int(value):
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, int):
+        return value
+    raise ValueError
+
+
+def parse_timesheet(payload):
+    """
+    payload = {"entries": [
+        {"person": 12, "date": "2025-03-03",
+         "status": "work", "planned_hours": "8", "actual_hours": 7.5, "note": "",
+         "work": {"<work_package_id>": "2.5", ...}},
+        ...
+    ]}
+
+    Velden van RosterDay (status, planned_hours, actual_hours, note) zijn
+    optioneel; staat er één, dan wordt de hele dag overschreven zoals in het
+    dag-dialoog (ontbrekend = "work" / leeg). "work" zet alleen de genoemde
+    pakketten; null, "" of 0 haalt een pakket weg.
+
+    Geeft (days, work, errors) terug: days = {(person_id, date): {veld: waarde}},
+    work = {(person_id, date, work_package_id): Decimal of None},
+    errors = ["entries[3].date: ongeldige datum", ...]. Bij fouten is er niets
+    om te schrijven.
+    """
+    entries = payload.get("entries") if isinstance(payload, dict) else None
+    if not isinstance(entries, list) or not entries:
+        return {}, {}, ["entries: verwacht een niet-lege lijst"]
+    if len(entries) > MAX_ENTRIES:
+        return {}, {}, [f"entries: maximaal {MAX_ENTRIES} per request"]
+
+    days, work, errors = {}, {}, []
+    seen = set()
+    for i, entry in enumerate(entries):
+        where = f"entries[{i}]"
+        if not isinstance(entry, dict):
+            errors.append(f"{where}: verwacht een object")
+            continue
+
+        try:
+            person_id = _int(entry.get("person"))
+        except ValueError:
+            errors.append(f"{where}.person: verwacht een id")
+            continue
+        try:
+            d = date.fromisoformat(entry.get("date") or "")
+        except (TypeError, ValueError):
+            errors.append(f"{where}.date: ongeldige datum (YYYY-MM-DD)")
+            continue
+        if (person_id, d) in seen:
+            errors.append(f"{where}: persoon {person_id} op {d} staat er al eerder in")
+            continue
+        seen.add((person_id, d))
+
+        if any(field in entry for field in DAY_FIELDS):
+            status = entry.get("status") or "work"
+            if not isinstance(status, str):
+                errors.append(f"{where}.status: verwacht tekst")
+            elif status not in STATUSES:
+                errors.append(f"{where}.status: onbekende status {status!r}")
+            day = {"status": status, "note": entry.get("note") or ""}
+            if not isinstance(day["note"], str):
+                errors.append(f"{where}.note: verwacht tekst")
+            for field in ("planned_hours", "actual_hours"):
+                try:
+                    day[field] = _hours(entry.get(field))
+                except ValueError as e:
+                    errors.append(f"{where}.{field}: {e}")
+            days[(person_id, d)] = day
+
+        packages = entry.get("work") or {}
+        if not isinstance(packages, dict):
+            errors.append(f"{where}.work: verwacht {{work_package_id: uren}}")
+            continue
+        for wp_key, value in packages.items():
+            try:
+                wp_id = _int(wp_key)
+            except ValueError:
+                errors.append(f"{where}.work: ongeldig werkpakket id {wp_key!r}")
+                continue
+            try:
+                work[(person_id, d, wp_id)] = _hours(value)
+            except ValueError as e:
+                errors.append(f"{where}.work.{wp_id}: {e}")
+
+    person_ids = {person_id for person_id, _ in seen}
+    missing = person_ids - set(Person.objects.filter(id__in=person_ids).values_list("id", flat=True))
+    if missing:
+        errors.append(f"person: onbekend {', '.join(map(str, sorted(missing)))}")
+    unknown = unknown_work_packages(wp_id for _, _, wp_id in work)
+    if unknown:
+        errors.append(f"work: onbekend werkpakket {', '.join(map(str, unknown))}")
+
+    return days, work, errors
+
+
+def write_roster_days(days):
+    """days: {(person_id, date): {"status", "planned_hours", "actual_hours", "note"}}"""
+    if not days:
+        return 0
+    RosterDay.objects.bulk_create(
+        [RosterDay(person_id=person_id, date=d, **fields) for (person_id, d), fields in days.items()],
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["person", "date"],
+        update_fields=list(DAY_FIELDS),
+    )
+    return len(days)
+
+
+def apply_timesheet(days, work):
+    """
+    Schrijft de uitkomst van parse_timesheet in één transactie weg en
+    ververst PlannedDay. Geeft {"persons", "days", "work", "deleted"} terug.
+    """
+    keys = set(days) | {(person_id, d) for person_id, d, _ in work}
+    person_ids = sorted({person_id for person_id, _ in keys})
+    dates = [d for _, d in keys]
+
+    with transaction.atomic():
+        day_count = write_roster_days(days)
+        written, deleted = write_day_work(work)
+        if keys:
+            refresh_planned_days(person_ids, min(dates), max(dates))
+
+    return {"persons": len(person_ids), "days": day_count, "work": written, "deleted": deleted}
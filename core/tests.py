@@ -1,3 +1,558 @@
-from django.test import TestCase
+import os
+import re
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Case, When, Value, IntegerField
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.management.commands.run_notification_scheduler import Command as SchedulerCommand
+from core.models import Person, PlannedDay, Roster, RosterDay, RosterDayWork, Signal, SignalCategory, Notification, NotificationCounter, WorkPackage
+from core.services import events
+from core.services.bulk_signals import apply_bulk_action
+from core.pagination import keyset_paginate
+from core.services.month_summary import month_summary
+from core.services.planned_days import planned_totals, rebuild_planned_days
+from core.services.notifications import build_notification, create_due_notifications, due_signals, insert_notifications, upcoming_signals
+from core.services.roster_calendar import RosterCalendar, resolve_day
+from core.services.search import search_people, search_signals
+from core.services.timesheet import parse_timesheet
+from core.views import MAX_PER_PAGE, _per_page
+
+
+# bare "SCAN core_signal" = full table scan (SEARCH ... USING INDEX is goed)
+FULL_SCAN = re.compile(r"^SCAN (core_signal|core_notification|core_person|core_personsearchtoken)\b")
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite-specifiek")
+class HotQueryPlanTests(TestCase):
+    """
+    Query-plan regressietest voor de Signal/Notification filters van
+    signal_list, notification_list, dashboard en de notificatie-services.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="coach", is_staff=True)
+
+    def plan(self, qs):
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[3] for row in cursor.fetchall()]
+
+    def assertNoFullScan(self, name, qs):
+        plan = self.plan(qs)
+        scans = [line for line in plan if FULL_SCAN.match(line)]
+        self.assertFalse(scans, f"{name}: full table scan\n" + "\n".join(plan))
+
+    def signal_list(self, qs):
+        # zelfde volgorde als views.signal_list
+        return qs.annotate(
+            sort_open=Case(
+                When(status="open", then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            ),
+        ).order_by("sort_open", "active_from", "-created_at", "-id")[:26]
+
+    def test_hot_queries_use_indexes(self):
+        now = timezone.now()
+        base = Signal.objects.select_related("person", "category", "assigned_to", "created_by")
+        visible = base.filter(active_from__lte=now).exclude(status="done")
+
+        queries = {
+            "signal_list": self.signal_list(visible),
+            "signal_list show_done": self.signal_list(base.filter(active_from__lte=now)),
+            "signal_list status": self.signal_list(visible.filter(status="open")),
+            "signal_list assigned": self.signal_list(visible.filter(assigned_to=self.user)),
+            "signal_list category": self.signal_list(visible.filter(category__key="verzuim")),
+            "notification_list": visible.filter(assigned_to=self.user),
+            "dashboard open": Signal.objects.filter(status="open").order_by(),
+            "dashboard done": Signal.objects.filter(status="done").order_by(),
+            "dashboard overdue": Signal.objects.filter(status="open", active_from__lt=now).order_by(),
+            "due notifications": due_signals(now=now).order_by("active_from", "id")[:1000],
+            "scheduler upcoming": upcoming_signals(now, now + timedelta(hours=24)),
+            "notification dropdown": (
+                Notification.objects.filter(user=self.user, is_read=False).order_by("-created_at")[:8]
+            ),
+            "person search": (
+                search_people(Person.objects.filter(person_type="student"), "van der Bërg")
+                .order_by("last_name", "first_name")[:50]
+            ),
+            "person search substring": (
+                search_people(Person.objects.filter(person_type="student"), "erg")
+                .order_by("last_name", "first_name")[:50]
+            ),
+            "person search phone": (
+                search_people(Person.objects.filter(person_type="student"), "06-1234 5678")
+                .order_by("last_name", "first_name")[:50]
+            ),
+        }
+
+        for name, qs in queries.items():
+            with self.subTest(name):
+                self.assertNoFullScan(name, qs)
+
+
+class SignalTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="coach", is_staff=True)
+        cls.person = Person.objects.create(first_name="Sam", last_name="de Vries")
+        cls.category = SignalCategory.objects.create(key="verzuim", name="Verzuim")
+
+    def signal(self, **kwargs):
+        kwargs.setdefault("assigned_to", self.user)
+        kwargs.setdefault("title", "Ziek")
+        return Signal.objects.create(person=self.person, category=self.category, body="", **kwargs)
+
+
+class NotificationInsertTests(SignalTestCase):
+
+    def test_conflicting_rows_are_skipped_and_not_counted(self):
+        # notify_assignee (post_save) heeft deze al aangemaakt
+        notified = self.signal()
+        later = self.signal(active_from=timezone.now() + timedelta(hours=1))
+        self.assertEqual(NotificationCounter.get_unread(self.user.id), 1)
+
+        with transaction.atomic():
+            created = insert_notifications([
+                build_notification(notified, self.user.id),
+                build_notification(later, self.user.id),
+            ])
+
+        self.assertEqual([n.signal_id for n in created], [later.id])
+        self.assertEqual(Notification.objects.filter(signal=notified).count(), 1)
+        self.assertEqual(NotificationCounter.get_unread(self.user.id), 2)
+
+
+class NotificationSchedulerTests(SignalTestCase):
+
+    def scheduler(self, now):
+        cmd = SchedulerCommand(stdout=StringIO())
+        cmd.refresh = timedelta(seconds=30)
+        cmd.horizon = timedelta(hours=24)
+        cmd.heap, cmd.due_at = [], {}
+        cmd.last_refresh = cmd.loaded_until = now
+        cmd._extend(now)
+        return cmd
+
+    def test_signal_due_between_refreshes_is_notified(self):
+        started = timezone.now()
+        cmd = self.scheduler(started)
+
+        # opgeslagen na de vorige refresh, actief 5s later: nog geen notificatie
+        signal = self.signal(active_from=timezone.now() + timedelta(seconds=5))
+        self.assertFalse(Notification.objects.filter(signal=signal).exists())
+
+        # volgende refresh pas als active_from al verstreken is
+        later = started + timedelta(seconds=30)
+        cmd._refresh(later)
+        cmd._fire_due(later)
+
+        self.assertTrue(Notification.objects.filter(signal=signal, user=self.user).exists())
+        self.assertEqual(cmd.heap, [])
+
+
+class NotificationStreamSettingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="coach", is_staff=True)
+        NotificationCounter.recount(cls.user.id)
+
+    @override_settings(NOTIFICATION_STREAM_ENABLED=False)
+    def test_disabled_stream_is_not_served_or_rendered(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/notifications/stream/").status_code, 404)
+        page = self.client.get("/notifications/").content.decode()
+        self.assertIn("const liveUpdates = false;", page)
+
+    @override_settings(NOTIFICATION_STREAM_ENABLED=True)
+    def test_bump_without_listener_skips_unread_query(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(NOTIFICATION_EVENTS_SOCKET_DIR=tmp):
+            self.assertFalse(events.wants(self.user.id))
+            # alleen de UPDATE; publish na commit vraagt niets op
+            with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+                NotificationCounter.bump(self.user.id, 1)
+
+            Path(tmp, f"{os.getpid()}-{self.user.id}.user").touch()
+            self.assertTrue(events.wants(self.user.id))
+
+
+class NotificationConditionalGetTests(SignalTestCase):
+    def marker_queries(self, url, table, **headers):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, **headers)
+        sql = [q["sql"] for q in ctx.captured_queries]
+        return response, [q for q in sql if "MAX(" in q and f'FROM "{table}"' in q]
+
+    def test_marker_aggregate_runs_once_per_request(self):
+        for url, table in (("/notifications/", "core_signal"), ("/notifications/dropdown/", "core_notification")):
+            with self.subTest(url):
+                response, markers = self.marker_queries(url, table)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(markers), 1)
+
+                response, markers = self.marker_queries(url, table, HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(len(markers), 1)
+
+    def test_renamed_person_or_category_changes_etag(self):
+        self.signal()
+        for url, table in (("/notifications/", "core_signal"), ("/notifications/dropdown/", "core_notification")):
+            for obj, field in ((self.person, "last_name"), (self.category, "name")):
+                with self.subTest(url=url, field=field):
+                    etag = self.marker_queries(url, table)[0]["ETag"]
+                    setattr(obj, field, f"{getattr(obj, field)} 2")
+                    obj.save()
+
+                    response, _ = self.marker_queries(url, table, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIn(getattr(obj, field), response.content.decode())
+
+
+class DueNotificationTests(SignalTestCase):
+    def setUp(self):
+        # active_from in de toekomst: post_save (notify_assignee) slaat ze over
+        soon = timezone.now() + timedelta(minutes=5)
+        self.signals = [self.signal(active_from=soon) for _ in range(3)]
+        self.later = soon + timedelta(minutes=1)
+
+    def test_create_due_notifications_is_idempotent(self):
+        self.assertEqual(create_due_notifications(now=self.later)["created"], 3)
+        self.assertEqual(create_due_notifications(now=self.later)["created"], 0)
+
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(NotificationCounter.get_unread(self.user.id), 3)
+
+    def test_counter_follows_mark_read(self):
+        create_due_notifications(now=self.later)
+        first = Notification.objects.filter(user=self.user).first()
+
+        first.mark_read()
+        Notification.objects.get(pk=first.pk).mark_read()  # tweede klik telt niet
+        self.assertEqual(NotificationCounter.get_unread(self.user.id), 2)
+
+        self.client.force_login(self.user)
+        self.client.post("/notifications/read-all/")
+        self.assertEqual(NotificationCounter.get_unread(self.user.id), 0)
+        self.assertEqual(NotificationCounter.recount(self.user.id), 0)
+
+
+class KeysetPaginateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for last_name in ["Bakker", "Jansen", "Bakker", "de Boer", "Visser", "Jansen", "Smit"]:
+            Person.objects.create(first_name="Kim", last_name=last_name)
+
+    def test_cursor_round_trip(self):
+        qs = Person.objects.all()
+        keys = [("last_name", False), ("id", True)]
+        expected = list(qs.order_by("last_name", "-id"))
+
+        pages, cursor = [], ""
+        while True:
+            page = keyset_paginate(qs, keys, cursor=cursor, per_page=3)
+            pages.append(page)
+            if not page["has_next"]:
+                break
+            cursor = page["next_cursor"]
+
+        self.assertEqual([p for page in pages for p in page["object_list"]], expected)
+        self.assertEqual([len(page["object_list"]) for page in pages], [3, 3, 1])
+        self.assertEqual(pages[0]["total"], 7)
+        self.assertFalse(pages[0]["has_previous"])
+
+        # terug vanaf de laatste pagina geeft dezelfde middelste pagina
+        back = keyset_paginate(qs, keys, cursor=pages[-1]["prev_cursor"], per_page=3)
+        self.assertEqual(back["object_list"], pages[1]["object_list"])
+        self.assertTrue(back["has_previous"])
+        self.assertTrue(back["has_next"])
+
+    def test_invalid_cursor_starts_at_first_page(self):
+        page = keyset_paginate(Person.objects.all(), [("id", True)], cursor="nonsense", per_page=3)
+        self.assertEqual(page["object_list"], list(Person.objects.order_by("-id")[:3]))
+
+    def test_per_page_parameter_is_validated(self):
+        for per_page, expected in (("abc", 50), ("", 50), ("-5", 1), ("20", 20), ("100000", MAX_PER_PAGE)):
+            with self.subTest(per_page):
+                request = RequestFactory().get("/people/", {"per_page": per_page})
+                self.assertEqual(_per_page(request, 50), expected)
+
+
+class RosterCalendarTests(SimpleTestCase):
+    # RosterCalendar werkt op Roster objecten; opslaan is niet nodig
+    def roster(self, start, end, cycle_start=None, pk=None, **hours):
+        return Roster(
+            id=pk, person_id=1, start_date=start, end_date=end, cycle_start_date=cycle_start,
+            **{field: Decimal(value) for field, value in hours.items()},
+        )
+
+    def test_week_a_and_b_alternate_from_cycle_start(self):
+        # maandag 6 januari 2025 is week A
+        calendar = RosterCalendar([
+            self.roster(date(2024, 12, 23), date(2025, 12, 31), cycle_start=date(2025, 1, 6), mon_a_hours="8", mon_b_hours="4"),
+        ])
+        self.assertEqual(calendar.planned(1, date(2025, 1, 6)), Decimal("8"))
+        self.assertEqual(calendar.planned(1, date(2025, 1, 13)), Decimal("4"))
+        self.assertEqual(calendar.planned(1, date(2025, 1, 20)), Decimal("8"))
+        # vóór cycle_start loopt het patroon terug: de week ervoor is week B
+        self.assertEqual(calendar.planned(1, date(2024, 12, 30)), Decimal("4"))
+        self.assertEqual(calendar.planned(1, date(2024, 12, 23)), Decimal("8"))
+        self.assertEqual(calendar.planned(1, date(2024, 12, 16)), Decimal("0"))  # buiten het rooster
+        self.assertEqual(calendar.planned(1, date(2025, 1, 7)), Decimal("0"))  # dinsdag niet ingevuld
+        self.assertEqual(calendar.planned(2, date(2025, 1, 6)), Decimal("0"))  # andere persoon
+
+    def test_latest_start_wins_on_overlap(self):
+        calendar = RosterCalendar([
+            self.roster(date(2025, 1, 1), date(2025, 12, 31), pk=1, mon_a_hours="8", mon_b_hours="8"),
+            self.roster(date(2025, 3, 1), date(2025, 3, 31), pk=2, mon_a_hours="6", mon_b_hours="6"),
+        ])
+        mondays = [date(2025, 2, 24), date(2025, 3, 3), date(2025, 3, 31), date(2025, 4, 7)]
+        self.assertEqual([calendar.planned(1, d) for d in mondays], [Decimal(h) for h in ("8", "6", "6", "8")])
+        self.assertEqual(
+            [hours for d, hours in calendar.planned_range(1, date(2025, 2, 24), date(2025, 4, 7)) if d in mondays],
+            [Decimal(h) for h in ("8", "6", "6", "8")],
+        )
+
+    def test_same_start_lowest_id_wins(self):
+        # zoals order_by("-start_date") in person_detail: bij gelijke start het eerst aangemaakte rooster
+        calendar = RosterCalendar([
+            self.roster(date(2026, 1, 29), date(2026, 3, 31), pk=37, thu_a_hours="7", thu_b_hours="7"),
+            self.roster(date(2026, 1, 29), date(2026, 2, 28), pk=35, thu_a_hours="3.5", thu_b_hours="3.5"),
+        ])
+        self.assertEqual(calendar.planned(1, date(2026, 1, 29)), Decimal("3.5"))
+        self.assertEqual(calendar.planned_range(1, date(2026, 2, 26), date(2026, 2, 26)), [(date(2026, 2, 26), Decimal("3.5"))])
+        # na het einde van rooster 35 neemt 37 het over
+        self.assertEqual(calendar.planned(1, date(2026, 3, 5)), Decimal("7"))
+        self.assertEqual([r.id for r in calendar.rosters(1)], [35, 37])
+
+    def test_resolve_day_applies_override(self):
+        eight = Decimal("8")
+        self.assertEqual(resolve_day(eight), ("work", eight, eight, ""))
+        self.assertEqual(resolve_day(eight, RosterDay(status="sick", note="griep")), ("sick", eight, Decimal("0"), "griep"))
+        self.assertEqual(
+            resolve_day(eight, RosterDay(status="work", planned_hours=Decimal("6"), actual_hours=Decimal("5.5"))),
+            ("work", Decimal("6"), Decimal("5.5"), ""),
+        )
+        self.assertEqual(resolve_day(eight, RosterDay(status="swapped")), ("swapped", eight, eight, ""))
+
+
+class PlannedDayTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.person = Person.objects.create(first_name="Sam", last_name="de Vries")
+
+    def planned(self):
+        return list(PlannedDay.objects.filter(person=self.person).order_by("date").values_list("date", "status", "planned_hours"))
+
+    def test_model_saves_refresh_planned_days(self):
+        # zoals de admin: gewone save/delete, zonder de roster views
+        Roster.objects.create(person=self.person, start_date=date(2025, 3, 3), end_date=date(2025, 3, 4), mon_a_hours=8)
+        self.assertEqual(self.planned(), [
+            (date(2025, 3, 3), "work", Decimal("8")),
+            (date(2025, 3, 4), "work", Decimal("0")),
+        ])
+
+        day = RosterDay.objects.create(person=self.person, date=date(2025, 3, 3), status="sick")
+        self.assertEqual(self.planned()[0][1], "sick")
+        day.date = date(2025, 3, 4)
+        day.save()
+        self.assertEqual([status for _, status, _ in self.planned()], ["work", "sick"])
+
+        day.delete()
+        Roster.objects.filter(person=self.person).get().delete()
+        self.assertEqual(self.planned(), [])
+
+    def test_planned_totals_sum_the_period(self):
+        Roster.objects.create(
+            person=self.person, start_date=date(2025, 3, 3), end_date=date(2025, 3, 9),
+            mon_a_hours=8, tue_a_hours=Decimal("4.5"),
+        )
+        RosterDay.objects.create(person=self.person, date=date(2025, 3, 4), status="sick")
+        package = WorkPackage.objects.create(code="1.1", title="Begeleiding")
+        RosterDayWork.objects.create(person=self.person, date=date(2025, 3, 3), work_package=package, hours=Decimal("2.25"))
+
+        self.assertEqual(planned_totals(self.person.id, date(2025, 1, 1), date(2025, 12, 31)), {
+            "planned": Decimal("12.50"), "actual": Decimal("8.00"), "worked": Decimal("2.25"),
+        })
+        self.assertEqual(planned_totals(self.person.id, date(2025, 3, 4), date(2025, 3, 4))["planned"], Decimal("4.50"))
+
+    def test_rebuild_replaces_stale_rows(self):
+        Roster.objects.create(person=self.person, start_date=date(2025, 3, 3), end_date=date(2025, 3, 3), mon_a_hours=8)
+        other = Person.objects.create(first_name="Jan", last_name="Jansen")
+        PlannedDay.objects.filter(person=self.person).update(planned_hours=1)
+        PlannedDay.objects.create(person=other, date=date(2025, 3, 3))
+
+        self.assertEqual(rebuild_planned_days(), (1, 1))
+        self.assertEqual(self.planned(), [(date(2025, 3, 3), "work", Decimal("8"))])
+        self.assertFalse(PlannedDay.objects.filter(person=other).exists())
+
+
+class MonthSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.person = Person.objects.create(first_name="Sam", last_name="de Vries")
+        cls.package = WorkPackage.objects.create(code="1.1", title="Begeleiding")
+
+    def test_stats_match_the_grid(self):
+        # maandag 3 maart 2025: week A, 10 maart: week B
+        Roster.objects.create(
+            person=self.person, start_date=date(2025, 3, 3), end_date=date(2025, 3, 16),
+            mon_a_hours=8, mon_b_hours=4, tue_a_hours=Decimal("7.5"),
+        )
+        RosterDay.objects.create(person=self.person, date=date(2025, 3, 4), status="sick")
+        RosterDay.objects.create(person=self.person, date=date(2025, 3, 10), actual_hours=Decimal("3.25"))
+
+        stats = month_summary(self.person.id, date(2025, 3, 1), date(2025, 3, 31))["month_stats"]
+        self.assertEqual(stats, {
+            "workable_days": 2,
+            "planned_hours_total": Decimal("19.50"),
+            "actual_hours_total": Decimal("11.25"),
+            "status_counts": {"sick": 1, "work": 30},
+        })
+
+    def test_work_package_edit_is_visible_at_once(self):
+        RosterDayWork.objects.create(person=self.person, date=date(2025, 3, 3), work_package=self.package, hours=Decimal("2.5"))
+        month = (self.person.id, date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual(month_summary(*month)["month_totals"], {"1.1": Decimal("2.50")})
+
+        self.package.code = "2.1"
+        self.package.save()
+        summary = month_summary(*month)
+        self.assertEqual(summary["month_totals"], {"2.1": Decimal("2.50")})
+        self.assertEqual(summary["month_parent_totals"], {"2": Decimal("2.50")})
+        self.assertEqual(summary["year_totals"]["worked"], Decimal("2.50"))
+
+
+class ParseTimesheetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.person = Person.objects.create(first_name="Sam", last_name="de Vries")
+        cls.package = WorkPackage.objects.create(code="1.1", title="Begeleiding")
+
+    def test_valid_entry(self):
+        days, work, errors = parse_timesheet({"entries": [
+            {"person": self.person.id, "date": "2025-03-03", "status": "sick", "note": "griep",
+             "work": {str(self.package.id): "2,5"}},
+            {"person": str(self.person.id), "date": "2025-03-04", "work": {self.package.id: 0}},
+        ]})
+        self.assertEqual(errors, [])
+        self.assertEqual(days, {
+            (self.person.id, date(2025, 3, 3)): {"status": "sick", "note": "griep", "planned_hours": None, "actual_hours": None},
+        })
+        self.assertEqual(work, {
+            (self.person.id, date(2025, 3, 3), self.package.id): Decimal("2.5"),
+            (self.person.id, date(2025, 3, 4), self.package.id): Decimal("0"),
+        })
+
+    def test_validation_errors(self):
+        pid = self.person.id
+        _, _, errors = parse_timesheet({"entries": [
+            {"person": pid, "date": "2025-02-30"},
+            {"person": 999999, "date": "2025-03-01", "work": {"77777": "1", "x": "2"}},
+            {"person": pid, "date": "2025-03-03", "status": "nope", "planned_hours": "123", "actual_hours": "1.234"},
+            {"person": pid, "date": "2025-03-03"},
+            {"person": True, "date": "2025-03-05"},
+            "x",
+        ]})
+        self.assertEqual(errors, [
+            "entries[0].date: ongeldige datum (YYYY-MM-DD)",
+            "entries[1].work: ongeldig werkpakket id 'x'",
+            "entries[2].status: onbekende status 'nope'",
+            "entries[2].planned_hours: moet tussen 0 en 99.99 liggen",
+            "entries[2].actual_hours: max. 2 decimalen",
+            f"entries[3]: persoon {pid} op 2025-03-03 staat er al eerder in",
+            "entries[4].person: verwacht een id",
+            "entries[5]: verwacht een object",
+            "person: onbekend 999999",
+            "work: onbekend werkpakket 77777",
+        ])
+
+    def test_non_scalar_values(self):
+        pid = self.person.id
+        _, _, errors = parse_timesheet({"entries": [
+            {"person": pid, "date": "2025-03-03", "status": ["sick"]},
+            {"person": pid, "date": "2025-03-04", "status": {"x": 1}, "note": ["x"], "planned_hours": [8]},
+            {"person": pid, "date": ["2025-03-05"]},
+        ]})
+        self.assertEqual(errors, [
+            "entries[0].status: verwacht tekst",
+            "entries[1].status: verwacht tekst",
+            "entries[1].note: verwacht tekst",
+            "entries[1].planned_hours: geen getal",
+            "entries[2].date: ongeldige datum (YYYY-MM-DD)",
+        ])
+
+        self.client.force_login(get_user_model().objects.create(username="coach", is_staff=True))
+        response = self.client.post(
+            "/roster/timesheet/",
+            {"entries": [{"person": pid, "date": "2025-03-03", "status": ["sick"]}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": ["entries[0].status: verwacht tekst"]})
+
+    def test_empty_payload(self):
+        for payload in ({}, {"entries": []}, [], None):
+            with self.subTest(payload=payload):
+                self.assertEqual(parse_timesheet(payload), ({}, {}, ["entries: verwacht een niet-lege lijst"]))
+
+
+class PersonSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.zoe = Person.objects.create(
+            first_name="Zoë", last_name="van der Bérg", email="zoe.berg@example.nl",
+            city="Utrecht", phone="06-1234 5678",
+        )
+        cls.other = Person.objects.create(first_name="Jan", last_name="Jansen", email="jan@test.nl", phone="0201112222")
+
+    def found(self, q):
+        return list(search_people(Person.objects.all(), q))
+
+    def test_token_prefix(self):
+        for q in ("zoe", "van der berg", "vanderberg", "Bérg Zo", "0612"):
+            with self.subTest(q=q):
+                self.assertEqual(self.found(q), [self.zoe])
+
+    def test_single_word_substring(self):
+        for q in ("erg", "example", "trecht", "ansen"):
+            with self.subTest(q=q):
+                self.assertEqual(len(self.found(q)), 1)
+
+    def test_last_digits_of_phone(self):
+        self.assertEqual(self.found("5678"), [self.zoe])
+        self.assertEqual(self.found("1234 5678"), [self.zoe])
+        self.assertEqual(self.found("2222"), [self.other])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.found("zoe jansen"), [])
+        self.assertEqual(len(self.found("")), 2)
+
+
+class SignalSearchTests(SignalTestCase):
+    def test_ranked_search_as_subquery_in_bulk_action(self):
+        hit = self.signal(title="Verzuim na griep")
+        self.signal(title="Gesprek gepland")
+        qs, ranked = search_signals(Signal.objects.all(), "griep")
+        self.assertTrue(ranked)
+
+        # de subquery krijgt een alias (U0): search_rank moet daarop correleren
+        top = Signal.objects.filter(id__in=qs.order_by("search_rank").values("id")[:10])
+        summary = apply_bulk_action(top, "set_done", self.user)
+        self.assertEqual((summary["matched"], summary["changed"]), (1, 1))
+        self.assertEqual(list(Signal.objects.filter(status="done")), [hit])
+
+        summary = apply_bulk_action(qs, "set_open", self.user)
+        self.assertEqual((summary["matched"], summary["changed"]), (1, 1))
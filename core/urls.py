@@ -10,7 +10,9 @@ urlpatterns = [
     # PERSONEN (centrale detailpagina)
     # =====================================================
 
+    path("people/", views.person_list, name="person_list"),
     path("people/<int:person_id>/", views.person_detail, name="person_detail"),
+    path("people/<int:person_id>/tab/<str:tab>/", views.person_tab, name="person_tab"),
 
     # Studenten (lijst + compatibele detail route)
     path("students/", views.student_list, name="student_list"),
@@ -30,7 +32,9 @@ urlpatterns = [
 
     path("signals/", views.signal_list, name="signal_list"),
     path("signals/new/", views.signal_create_global, name="signal_create_global"),
+    path("signals/export/", views.signal_export, name="signal_export"),
     path("signals/<int:signal_id>/notes/", views.signal_notes, name="signal_notes"),
+    path("signals/<int:signal_id>/dialog/", views.signal_dialog, name="signal_dialog"),
 
     # signal create (vanuit person/student/employee)
     path("people/<int:person_id>/signals/new/", views.signal_create, name="signal_create"),
@@ -46,6 +50,7 @@ urlpatterns = [
     path("notifications/read-all/", views.notification_mark_all_read, name="notification_mark_all_read"),
     path("notifications/<int:signal_id>/quick/", views.notification_quick_update, name="notification_quick_update"),
     path("notifications/dropdown/", views.notification_dropdown, name="notification_dropdown"),
+    path("notifications/stream/", views.notification_stream, name="notification_stream"),
 
     # =====================================================
     # ROOSTERS
@@ -53,11 +58,14 @@ urlpatterns = [
 
     path("people/<int:person_id>/roster/save/", views.roster_save, name="roster_save"),
     path("people/<int:person_id>/roster/day/<str:day>/save/", views.roster_day_save, name="roster_day_save"),
+    path("roster/timesheet/", views.timesheet_save, name="timesheet_save"),
     
     path("people/<int:person_id>/rosters/new/", views.roster_create, name="roster_create"),
     path("people/<int:person_id>/rosters/<int:roster_id>/edit/", views.roster_edit, name="roster_edit"),
     path("people/<int:person_id>/rosters/<int:roster_id>/delete/", views.roster_delete, name="roster_delete"),
 
+    path("team/", views.team_schedule, name="team_schedule"),
+
     # =====================================================
     # BEHEER (ADMIN IN PORTAL)
     # =====================================================
@@ -1,20 +1,45 @@
+import asyncio
 import calendar
+import hashlib
+import json
 
 from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from .auth import staff_required
 from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
 from django.utils import timezone
-from django.db.models import Q, Case, When, Value, IntegerField, Count
+from django.db.models import Q, F, Case, When, Value, IntegerField, Count, Max
+from django.db.models.functions import Coalesce
 from django.core.paginator import Paginator
 from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
 from collections import defaultdict
-from .models import Person, EmployeeProfile, Location, Organization, Signal, SignalCategory, Notification, SignalNote, StudentProfile, Location, ContactPerson, BenefitType, WorkPackage, Person, Roster, RosterDay, RosterDayWork
+from .models import Person, EmployeeProfile, Location, Organization, Signal, SignalCategory, Notification, NotificationCounter, SignalNote, StudentProfile, StudentDocument, Location, ContactPerson, BenefitType, WorkPackage, Person, Roster, RosterDay, RosterDayWork
+from .pagination import keyset_paginate
+from .prefetch import prefetch_top_n
+from .services.search import search_people, search_signals
 from .forms import SignalForm, SignalCreateFromListForm, SignalHistory, StudentCreateForm, EmployeeCreateForm, LocationForm, ContactPersonForm, OrganizationForm, BenefitTypeForm, WorkPackageForm
 from django.contrib.auth import get_user_model
+from .services import events
+from .services.bulk_signals import apply_bulk_action
+from .services.export import EXPORT_FORMATS, export_response
+from .services.team_schedule import build_team_schedule
+from .services.student_facets import filter_students, person_type_counts, student_facets, student_filters
+from .services.month_summary import month_summary
+from .services.roster_calendar import RosterCalendar, resolve_day
+from .services.timesheet import apply_timesheet, parse_timesheet, unknown_work_packages, write_day_work
+
+SSE_KEEPALIVE = 25  # seconden
+MAX_PER_PAGE = 200
 
 
 def _parse_month(s: str) -> date:
@@ -43,6 +68,17 @@ def _decimal_or_none(v: str):
     except InvalidOperation:
         return None
 
+def _per_page(request, default):
+    # ?per_page=abc of 100000: terug naar default resp. MAX_PER_PAGE
+    try:
+        per_page = int(request.GET.get("per_page") or default)
+    except ValueError:
+        per_page = default
+    return min(max(per_page, 1), MAX_PER_PAGE)
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 def _roster_overlaps(qs, start_date, end_date, exclude_id=None):
     qs = qs.filter(start_date__lte=end_date, end_date__gte=start_date)
     if exclude_id:
@@ -88,171 +124,148 @@ def dashboard(request):
         "signals_overdue": signals_overdue,
     })
 
-@staff_required
-def person_list(request):
-    person_type = request.GET.get("type", "student").strip()  # student|employee
-    q = request.GET.get("q", "").strip()
-
-    sort = request.GET.get("sort", "last_name")
-    direction = request.GET.get("dir", "asc")
-
-    allowed_sorts = {
-        "last_name": "last_name",
-        "first_name": "first_name",
-        "email": "email",
-        "city": "city",
-        "created": "created_at",
-    }
-
-    sort_field = allowed_sorts.get(sort, "last_name")
-    if direction == "desc":
-        sort_field = f"-{sort_field}"
-
-    qs = Person.objects.all()
-
+PEOPLE_SORTS = {
+    "last_name": ["last_name", "first_name"],
+    "first_name": ["first_name", "last_name"],
+    "email": ["email"],
+    "city": ["city", "last_name"],
+}
+PEOPLE_SORT_COLUMNS = [
+    ("last_name", "Achternaam"),
+    ("first_name", "Voornaam"),
+    ("email", "Email"),
+    ("city", "Woonplaats"),
+]
+
+
+def _people_directory(request, person_type, template):
+    """
+    Gedeelde personenlijst (person_list, student_list, employee_list):
+    zoeken via search_people, type-specifieke filters, één select_related
+    voor de student- én medewerkerkolommen en keyset paginering, zodat elke
+    pagina evenveel kost, ook bij tienduizenden personen.
+    """
+    base = Person.objects.all()
     if person_type in ("student", "employee"):
-        qs = qs.filter(person_type=person_type)
+        base = base.filter(person_type=person_type)
 
-    if q:
-        qs = qs.filter(
-            Q(first_name__icontains=q) |
-            Q(last_name__icontains=q) |
-            Q(email__icontains=q) |
-            Q(city__icontains=q)
-        )
+    filters = student_filters(request.GET)
+    job_title = request.GET.get("job_title", "").strip()
+
+    if person_type == "student":
+        qs = filter_students(base, filters)
+    else:
+        qs = search_people(base, filters["q"]) if filters["q"] else base
+        if person_type == "employee" and job_title:
+            qs = qs.filter(employee_profile__job_title__icontains=job_title)
 
-    qs = qs.order_by(sort_field, "first_name")
+    qs = qs.select_related(
+        "student_profile__location",
+        "student_profile__organization",
+        "employee_profile",
+    )
 
-    per_page = int(request.GET.get("per_page", 25) or 25)
-    paginator = Paginator(qs, per_page)
-    page_obj = paginator.get_page(request.GET.get("page"))
+    sort = request.GET.get("sort", "last_name").strip()
+    if sort not in PEOPLE_SORTS:
+        sort = "last_name"
+    direction = request.GET.get("dir", "asc").strip()
+    keys = [(field, direction == "desc") for field in PEOPLE_SORTS[sort]] + [("id", direction == "desc")]
+
+    per_page = _per_page(request, 50)
+    page_obj = keyset_paginate(qs, keys, cursor=request.GET.get("cursor", "").strip(), per_page=per_page)
+    people = page_obj["object_list"]
+
+    # meldingen tellen alleen voor de rijen op deze pagina (één GROUP BY)
+    signal_counts = {
+        row["person_id"]: row
+        for row in Signal.objects.filter(person_id__in=[p.id for p in people])
+        .order_by()
+        .values("person_id")
+        .annotate(total=Count("id"), open=Count("id", filter=Q(status="open")))
+    }
+    for p in people:
+        counts = signal_counts.get(p.id, {})
+        p.signal_count = counts.get("total", 0)
+        p.open_signal_count = counts.get("open", 0)
 
-    # voor links filters behouden
     params = request.GET.copy()
-    params.pop("page", None)
+    for key in ("sort", "dir", "cursor", "page"):
+        params.pop(key, None)
     base_qs = params.urlencode()
 
-    return render(request, "core/person_list.html", {
+    context = {
         "page_obj": page_obj,
-        "people": page_obj.object_list,
-        "type": person_type,
-        "q": q,
+        "people": people,
+        "type": person_type or "",
+        "type_counts": person_type_counts(Person.objects.all(), filters["q"]),
+        **filters,  # location_id/organization_id als string, zoals je template verwacht
+        "job_title": job_title,
         "sort": sort,
         "dir": direction,
+        "sort_columns": PEOPLE_SORT_COLUMNS,
         "base_qs": base_qs,
         "active_nav": "people",
-    })
-
-def _month_work_stats(cells):
-    """
-    cells = jouw calendar grid items (dicts) + None's.
-    We tellen alleen echte dagen (dict) mee.
-
-    Werkbare dag = status == "work" én planned > 0
-    (Je kunt dit aanpassen als je ook 'swapped' wilt meetellen.)
-    """
-    stats = {
-        "workable_days": 0,
-        "planned_hours_total": Decimal("0"),
-        "actual_hours_total": Decimal("0"),
-        "status_counts": defaultdict(int),
     }
+    if person_type == "student":
+        # aantallen per filteroptie (onder de overige filters), kort gecachet
+        context.update({
+            "facets": student_facets(base, filters),
+            "locations": Location.objects.all().order_by("name"),
+            "orgs": Organization.objects.all().order_by("name", "name"),
+        })
+    return render(request, template, context)
 
-    for cell in cells:
-        if not cell:
-            continue
-
-        status = cell.get("status") or "work"
-        planned = cell.get("planned") or Decimal("0")
-        actual = cell.get("actual") or Decimal("0")
-
-        stats["status_counts"][status] += 1
-        stats["planned_hours_total"] += planned
-        stats["actual_hours_total"] += actual
-
-        if status == "work" and planned > 0:
-            stats["workable_days"] += 1
-
-    # maak status_counts JSON/template vriendelijk
-    stats["status_counts"] = dict(stats["status_counts"])
-    return stats
 
 @staff_required
-def person_detail(request, person_id):
-    person = get_object_or_404(
+def person_list(request):
+    person_type = request.GET.get("type", "").strip()  # student|employee|"" (iedereen)
+    if person_type not in ("student", "employee"):
+        person_type = None
+    return _people_directory(request, person_type, "core/person_list.html")
+
+
+PERSON_TABS = [
+    ("profile", "Profiel"),
+    ("roster", "Rooster & uren"),
+    ("guidance", "Begeleiding & instanties"),
+    ("education", "Opleiding"),
+    ("contract", "Contract"),
+    ("loonwaardejc", "Loonwaarde & Jobcoaching"),
+    ("signals", "Meldingen"),
+    ("documents", "Documenten"),
+]
+PERSON_TAB_TEMPLATES = {
+    "roster": "core/partials/person_tab_roster.html",
+    "signals": "core/partials/person_tab_signals.html",
+    "documents": "core/partials/person_tab_documents.html",
+}
+
+
+def _person_for_detail(person_id):
+    return get_object_or_404(
         Person.objects.select_related(
             "student_profile",
             "student_profile__location",
             "student_profile__organization",
             "student_profile__contact_person",
             "employee_profile",
-        ).prefetch_related(
-            "signals__category",
-            "signals__assigned_to",
-            "signals__created_by",
-            "signals__notes__author",
-            "signals__history__actor",
         ),
         id=person_id
     )
 
 
+def _person_tab(request):
     tab = request.GET.get("tab", "profile")
+    return tab if tab in dict(PERSON_TABS) else "profile"
 
-    User = get_user_model()
-    assignees = User.objects.filter(is_staff=True).order_by("username")
-    signal_categories = SignalCategory.objects.all().order_by("name")
-
-
-    open_id = request.GET.get("open", "").strip()
-
-
-    signal_form = SignalForm()  # popup create
-
-    month_start = _parse_month(request.GET.get("month", "").strip())
-    month_end_day = calendar.monthrange(month_start.year, month_start.month)[1]
-    month_end = date(month_start.year, month_start.month, month_end_day)
-
-    prev_month = _add_month(month_start, -1)
-    next_month = _add_month(month_start, 1)
-
-    # actieve roosters die overlappen met deze maand
-    rosters = list(
-        Roster.objects.filter(person=person, start_date__lte=month_end, end_date__gte=month_start)
-        .order_by("-start_date")
-    )
-    active_roster = rosters[0] if rosters else None
-
-    # day overrides
-    roster_days = RosterDay.objects.filter(person=person, date__gte=month_start, date__lte=month_end)
-    day_map = {rd.date: rd for rd in roster_days}
 
-    # work entries (alle werkpakket regels van deze maand)
+def _work_entries(person, start, end):
+    """{date: [{"code", "title", "hours", "wp_id", "parent_code"}]} voor de kalendercellen."""
     works = (RosterDayWork.objects
-             .filter(person=person, date__gte=month_start, date__lte=month_end)
+             .filter(person=person, date__gte=start, date__lte=end)
              .select_related("work_package")
              .order_by("date", "work_package__sort_order", "work_package__code"))
 
-    # ✅ maandtotalen per werkpakket en per hoofdwerkpakket
-    month_totals = {}
-    month_parent_totals = {}
-
-    for w in works:
-        code = w.work_package.code
-        parent_code = (code or "").split(".")[0]
-
-        # totaal per subwerkpakket
-        month_totals[code] = month_totals.get(code, Decimal("0")) + (w.hours or Decimal("0"))
-
-        # totaal per hoofdwerkpakket
-        month_parent_totals[parent_code] = month_parent_totals.get(parent_code, Decimal("0")) + (w.hours or Decimal("0"))
-
-    
-    month_grand_total = Decimal("0")
-
-    for total in month_parent_totals.values():
-        month_grand_total += total
-
     work_map = {}
     for w in works:
         parent_code = (w.work_package.code or "").split(".")[0]  # "1.1" -> "1"
@@ -263,13 +276,63 @@ def person_detail(request, person_id):
             "wp_id": w.work_package_id,
             "parent_code": parent_code,   # ✅ nieuw
         })
+    return work_map
 
+
+def _work_package_choices():
     # work packages voor invul-dialog (toon alleen subpakketten, gegroepeerd per hoofd)
     parents = WorkPackage.objects.filter(parent__isnull=True).order_by("sort_order", "code")
     children = WorkPackage.objects.filter(parent__isnull=False).select_related("parent").order_by("parent__sort_order", "sort_order", "code")
     children_by_parent = {}
     for c in children:
         children_by_parent.setdefault(c.parent_id, []).append(c)
+    return parents, children_by_parent
+
+
+def _roster_cell(d, planned_base, override, entries, rosters):
+    # basis planned uit rooster template, override uit RosterDay
+    status, planned, actual, note = resolve_day(planned_base, override)
+
+    totals_by_parent = {}
+    for e in entries:
+        p = e.get("parent_code") or "-"
+        totals_by_parent[p] = totals_by_parent.get(p, Decimal("0")) + (e["hours"] or Decimal("0"))
+
+    return {
+        "date": d,
+        "day": d.day,
+        "status": status,
+        "planned": planned,
+        "actual": actual,
+        "note": note,
+        "entries": entries,
+        "totals_by_parent": totals_by_parent,
+        "rosters": rosters,
+    }
+
+
+def _month_end(month_start):
+    return date(month_start.year, month_start.month, calendar.monthrange(month_start.year, month_start.month)[1])
+
+
+def _roster_tab_context(person, month_start):
+    month_end = _month_end(month_start)
+
+    prev_month = _add_month(month_start, -1)
+    next_month = _add_month(month_start, 1)
+
+    # actieve roosters die overlappen met deze maand
+    roster_calendar = RosterCalendar.for_person(person, month_start, month_end)
+    rosters = roster_calendar.rosters(person.id)
+    active_roster = rosters[0] if rosters else None
+
+    # day overrides
+    roster_days = RosterDay.objects.filter(person=person, date__gte=month_start, date__lte=month_end)
+    day_map = {rd.date: rd for rd in roster_days}
+
+    # work entries (alle werkpakket regels van deze maand)
+    work_map = _work_entries(person, month_start, month_end)
+    parents, children_by_parent = _work_package_choices()
 
     # calendar grid: lege cellen vóór 1e, alleen dagen van de maand
     first_weekday = month_start.weekday()  # maandag=0
@@ -279,177 +342,90 @@ def person_detail(request, person_id):
     for _ in range(first_weekday):
         cells.append(None)
 
-    # days
-    for day_num in range(1, month_end_day + 1):
-        d = date(month_start.year, month_start.month, day_num)
-
-        # basis planned uit rooster template (laatste rooster dat deze dag dekt)
-        planned_base = Decimal("0")
-        roster_for_day = None
-        for r in rosters:
-            if r.start_date <= d <= r.end_date:
-                roster_for_day = r
-                break
-
-        if roster_for_day:
-            wd = d.weekday()  # 0=ma
-
-            cycle_start = roster_for_day.cycle_start_date or roster_for_day.start_date
-            delta_days = (d - cycle_start).days
-            week_index = ((delta_days // 7) % 2)  # 0=A, 1=B
-
-            week_a = [
-                roster_for_day.mon_a_hours,
-                roster_for_day.tue_a_hours,
-                roster_for_day.wed_a_hours,
-                roster_for_day.thu_a_hours,
-                roster_for_day.fri_a_hours,
-                roster_for_day.sat_a_hours,
-                roster_for_day.sun_a_hours,
-            ]
-            week_b = [
-                roster_for_day.mon_b_hours,
-                roster_for_day.tue_b_hours,
-                roster_for_day.wed_b_hours,
-                roster_for_day.thu_b_hours,
-                roster_for_day.fri_b_hours,
-                roster_for_day.sat_b_hours,
-                roster_for_day.sun_b_hours,
-            ]
-
-            planned_base = (week_a if week_index == 0 else week_b)[wd]
-
-
-        override = day_map.get(d)
-        status = override.status if override else "work"
-        planned = override.planned_hours if (override and override.planned_hours is not None) else planned_base
-        actual = override.actual_hours if (override and override.actual_hours is not None) else (Decimal("0") if status in ("sick","vacation","off") else planned)
-        note = override.note if override else ""
-
-        entries = work_map.get(d, [])
-        totals_by_parent = {}
-        for e in entries:
-            p = e.get("parent_code") or "-"
-            totals_by_parent[p] = totals_by_parent.get(p, Decimal("0")) + (e["hours"] or Decimal("0"))
-
-        cells.append({
-            "date": d,
-            "day": day_num,
-            "status": status,
-            "planned": planned,
-            "actual": actual,
-            "note": note,
-            "entries": entries,
-            "totals_by_parent": totals_by_parent,
-            "rosters": rosters,
-        })
-
+    for d, planned_base in roster_calendar.planned_range(person.id, month_start, month_end):
+        cells.append(_roster_cell(d, planned_base, day_map.get(d), work_map.get(d, []), rosters))
 
     # trailing blanks zodat je grid netjes uitkomt
     while len(cells) % 7 != 0:
         cells.append(None)
 
-    # groepeer subwerkpakketten per parent
-    month_totals_by_parent = {}
-
-    for code, total in month_totals.items():
-        parent = code.split(".")[0]
-        month_totals_by_parent.setdefault(parent, []).append({
-            "code": code,
-            "total": total,
-        })
-
-    # sorteer netjes
-    month_totals_by_parent = dict(sorted(month_totals_by_parent.items()))
-    for parent in month_totals_by_parent:
-        month_totals_by_parent[parent] = sorted(
-            month_totals_by_parent[parent],
-            key=lambda x: x["code"]
-        )
-   
-
-    month_stats = _month_work_stats(cells)
-
-    return render(request, "core/person_detail.html", {
-        "person": person,
-        "month_start": month_start,
+    return {
         "prev_month": prev_month,
         "next_month": next_month,
         "cells": cells,
         "active_roster": active_roster,
+        "rosters": rosters,
         "parents": parents,
         "children_by_parent": children_by_parent,
-        "assignees": assignees,
-        "signal_form": signal_form,
-        "open_id": open_id,
-        "active_nav": "people",
-        "rosters": rosters,
-        "tab": tab,
-        "signal_categories": signal_categories,
-        "month_totals": dict(sorted(month_totals.items())),
-        "month_parent_totals": dict(sorted(month_parent_totals.items())),
-        "month_totals_by_parent": month_totals_by_parent,
-         "month_grand_total": month_grand_total,
-         "month_stats": month_stats
-    })
-
-
-@staff_required
-def student_list(request):
-    qs = Person.objects.filter(person_type="student").select_related(
-        "student_profile",
-        "student_profile__location",
-        "student_profile__organization",
-    ).prefetch_related(
-        "student_profile__documents",
-        "signals__category",
-    )
+        # maand- en jaartotalen uit PlannedDay/RosterDayWork, zie month_summary
+        **month_summary(person.id, month_start, month_end),
+    }
 
-    q = request.GET.get("q", "").strip()
-    status = request.GET.get("status", "").strip()
-    location_id = request.GET.get("location", "").strip()
-    organization_id = request.GET.get("org", "").strip()
-    job_guarantee = request.GET.get("job_guarantee", "").strip()
-    praktijkroute = request.GET.get("praktijkroute", "").strip()
 
-    if q:
-        qs = qs.filter(
-            Q(first_name__icontains=q) |
-            Q(last_name__icontains=q) |
-            Q(email__icontains=q)
-        )
+def _person_tab_context(request, person, tab):
+    """
+    Context voor één tab van person_detail: alleen de queries die die tab
+    nodig heeft (rooster, meldingen of documenten; de overige tabs tonen
+    alleen velden van person).
+    """
+    month_start = _parse_month(request.GET.get("month", "").strip())
+    context = {
+        "person": person,
+        "tab": tab,
+        "month_start": month_start,
+        # return_url voor formulieren in de tab: de pagina, niet het fragment
+        "page_url": f"{reverse('person_detail', args=[person.id])}?tab={tab}&month={month_start:%Y-%m}",
+    }
 
-    if status:
-        qs = qs.filter(student_profile__status=status)
+    if tab == "roster":
+        context.update(_roster_tab_context(person, month_start))
+    elif tab == "signals":
+        context.update({
+            "signals": person.signals.select_related("category", "assigned_to", "created_by"),
+            "signal_categories": SignalCategory.objects.all().order_by("name"),
+            "assignees": get_user_model().objects.filter(is_staff=True).order_by("username"),
+        })
+    elif tab == "documents":
+        context["documents"] = StudentDocument.objects.filter(student__person=person).order_by("-uploaded_at")
 
-    if location_id.isdigit():
-        qs = qs.filter(student_profile__location_id=int(location_id))
+    return context
 
-    if organization_id.isdigit():
-        qs = qs.filter(student_profile__organization_id=int(organization_id))
 
-    if job_guarantee in ("0", "1"):
-        qs = qs.filter(student_profile__job_guarantee=(job_guarantee == "1"))
+@staff_required
+def person_detail(request, person_id):
+    person = _person_for_detail(person_id)
+    tab = _person_tab(request)
+
+    signal_count = person.signals.count()
+    context = _person_tab_context(request, person, tab)
+    context.update({
+        "person_tabs": [
+            (key, f"{label} ({signal_count})" if key == "signals" else label)
+            for key, label in PERSON_TABS
+        ],
+        "tab_template": PERSON_TAB_TEMPLATES.get(tab, "core/partials/person_tab_info.html"),
+        "open_id": request.GET.get("open", "").strip(),
+        "active_nav": "people",
+    })
+    return render(request, "core/person_detail.html", context)
 
-    if praktijkroute in ("0", "1"):
-        qs = qs.filter(student_profile__praktijkroute=(praktijkroute == "1"))
 
-    locations = Location.objects.all().order_by("name")
-    orgs = Organization.objects.all().order_by("name", "name")
+@staff_required
+def person_tab(request, person_id, tab):
+    """Fragment met alleen de inhoud van één tab (zie person_detail.html)."""
+    person = _person_for_detail(person_id)
+    if tab not in dict(PERSON_TABS):
+        raise Http404
+    return render(
+        request,
+        PERSON_TAB_TEMPLATES.get(tab, "core/partials/person_tab_info.html"),
+        _person_tab_context(request, person, tab),
+    )
 
-    return render(request, "core/student_list.html", {
-        "students": qs.order_by("last_name", "first_name"),
-        "q": q,
-        "status": status,
-        "location_id": location_id,   # string, zoals je template verwacht
-        "organization_id": organization_id,             # string, zoals je template verwacht
-        "job_guarantee": job_guarantee,
-        "praktijkroute": praktijkroute,
-        "locations": locations,
-        "orgs": orgs,
-        "active_nav": "people",
-    })
 
+@staff_required
+def student_list(request):
+    return _people_directory(request, "student", "core/student_list.html")
 
 
 @staff_required
@@ -513,57 +489,12 @@ def student_convert_to_employee(request, person_id):
     messages.success(request, "Student is omgezet naar medewerker (studentdata bewaard).")
     return redirect("dashboard")
 
-@staff_required
-def signal_list(request):
-    now = timezone.localtime(timezone.now())
-    # --- BULK ACTIONS ---
-    if request.method == "POST":
-        action = request.POST.get("action", "").strip()
-        ids = request.POST.getlist("ids")
-        return_url = request.POST.get("return_url") or request.get_full_path()
-
-        if not ids:
-            messages.warning(request, "Selecteer eerst één of meer meldingen.")
-            return redirect(return_url)
-
-        qs_bulk = Signal.objects.filter(id__in=ids)
-
-        if action == "set_open":
-            qs_bulk.update(status="open")
-            messages.success(request, f"{qs_bulk.count()} melding(en) op 'Open' gezet.")
-        elif action == "set_done":
-            qs_bulk.update(status="done")
-            messages.success(request, f"{qs_bulk.count()} melding(en) op 'Afgerond' gezet.")
-        elif action == "set_snoozed":
-            qs_bulk.update(status="snoozed")
-            messages.success(request, f"{qs_bulk.count()} melding(en) op 'Gepauzeerd' gezet.")
-        elif action == "delete":
-            qs_bulk.delete()
-            messages.success(request, "Meldingen verwijderd.")
-        else:
-            messages.error(request, "Onbekende bulk actie.")
-        return redirect(return_url)
-
-    open_id = request.GET.get("open", "").strip()
-
-    # sorting params (eerst!)
-    sort = request.GET.get("sort", "active_from").strip()
-    direction = request.GET.get("dir", "asc").strip()
-
-    # behoud alle filters in sort-links, behalve sort/dir zelf
-    params = request.GET.copy()
-    params.pop("sort", None)
-    params.pop("dir", None)
-    base_qs = params.urlencode()
-
-    qs = Signal.objects.select_related(
-        "person",
-        "category",
-        "assigned_to",
-        "created_by",
-    )
-
-    # filters
+def _filter_signals(request, qs, now):
+    """
+    De filters van signal_list (GET params). Gedeeld met de bulk acties,
+    zodat "alle meldingen die aan de filters voldoen" hetzelfde betekent.
+    Geeft (qs, ranked, filters) terug.
+    """
     status = request.GET.get("status", "").strip()
     scope = request.GET.get("scope", "").strip()
     assigned = request.GET.get("assigned", "").strip()
@@ -575,8 +506,6 @@ def signal_list(request):
     show_done = request.GET.get("show_done") == "1"
 
     person_type = request.GET.get("person_type", "").strip()
-    
-
 
     # DEFAULT: hide future + hide done
     if not show_future:
@@ -617,18 +546,93 @@ def signal_list(request):
         end = now + timezone.timedelta(days=7)
         qs = qs.filter(active_from__gte=now, active_from__lte=end)
 
+    ranked = False
     if q:
-        qs = qs.filter(
-            Q(title__icontains=q) |
-            Q(body__icontains=q) |
-            Q(person__first_name__icontains=q) |
-            Q(person__last_name__icontains=q)
-        )
+        qs, ranked = search_signals(qs, q)
 
-    categories = SignalCategory.objects.all().order_by("name")
-    orgs = Organization.objects.all().order_by("organization_type", "name")
+
+    filters = {
+        "status": status,
+        "scope": scope,
+        "assigned": assigned,
+        "category_key": category_key,
+        "organization_id": organization_id,
+        "show_future": show_future,
+        "show_done": show_done,
+        "person_type": person_type,
+        "q": q,
+    }
+    return qs, ranked, filters
+
+
+BULK_MESSAGES = {
+    "set_open": "{changed} melding(en) op 'Open' gezet.",
+    "set_done": "{changed} melding(en) op 'Afgerond' gezet.",
+    "set_snoozed": "{changed} melding(en) op 'Gepauzeerd' gezet.",
+    "snooze_until": "{changed} melding(en) gepauzeerd tot {until:%d-%m-%Y %H:%M}.",
+    "reassign": "{changed} melding(en) doorgezet naar {assignee}.",
+    "delete": "{changed} melding(en) verwijderd.",
+}
+
+
+def _signal_bulk_action(request, now):
+    action = request.POST.get("action", "").strip()
+    return_url = request.POST.get("return_url") or request.get_full_path()
+
+    if action not in BULK_MESSAGES:
+        messages.error(request, "Onbekende bulk actie.")
+        return redirect(return_url)
+
+    # geselecteerde ids, of alles wat aan de huidige filters (GET params) voldoet
+    if request.POST.get("all_matching") == "1":
+        qs, _, _ = _filter_signals(request, Signal.objects.all(), now)
+    else:
+        ids = [i for i in request.POST.getlist("ids") if i.isdigit()]
+        if not ids:
+            messages.warning(request, "Selecteer eerst één of meer meldingen.")
+            return redirect(return_url)
+        qs = Signal.objects.filter(id__in=ids)
+
+    assignee = until = None
+    if action == "reassign":
+        assigned_to = request.POST.get("assigned_to", "").strip()
+        if assigned_to.isdigit():
+            assignee = get_user_model().objects.filter(id=int(assigned_to), is_staff=True).first()
+        if not assignee:
+            messages.error(request, "Kies een behandelaar om door te zetten.")
+            return redirect(return_url)
+    elif action == "snooze_until":
+        try:
+            until = datetime.strptime(request.POST.get("until", "").strip(), "%Y-%m-%dT%H:%M")
+        except ValueError:
+            messages.error(request, "Kies een datum/tijd om tot te pauzeren.")
+            return redirect(return_url)
+        until = timezone.make_aware(until)
+
+    summary = apply_bulk_action(qs, action, request.user, assignee=assignee, until=until)
+
+    text = BULK_MESSAGES[action].format(
+        changed=summary["changed"],
+        until=timezone.localtime(until) if until else None,
+        assignee=assignee.username if assignee else "",
+    )
+    unchanged = summary["matched"] - summary["changed"]
+    if unchanged and action != "delete":
+        text += f" {unchanged} ongewijzigd."
+    messages.success(request, text)
+    return redirect(return_url)
 
 
+def _sort_signals(request, qs, ranked):
+    """
+    Sortering van signal_list (sort/dir params). Geeft (qs, keys, sort, dir)
+    terug; keys is de volledige volgorde voor keyset_paginate.
+    """
+    # bij een zoekterm standaard op relevantie
+    default_sort = "relevance" if request.GET.get("q", "").strip() else "active_from"
+    sort = request.GET.get("sort", default_sort).strip()
+    direction = request.GET.get("dir", "asc").strip()
+
     # allowed sorts
     allowed_sorts = {
         "active_from": "active_from",
@@ -637,61 +641,142 @@ def signal_list(request):
         "category": "category__name",
         "title": "title",
         "status": "status",
+        "assigned": "assigned_to__username",
         "created_by": "created_by__username",
     }
 
     sort_field = allowed_sorts.get(sort, "active_from")
-    if direction == "desc":
-        sort_field = f"-{sort_field}"
+    # nullable kolommen (geen behandelaar/maker) als "" zodat de cursor kan vergelijken
+    if sort == "relevance" and ranked:
+        sort_key = F("search_rank")
+    elif sort_field in ("assigned_to__username", "created_by__username"):
+        sort_key = Coalesce(sort_field, Value(""))
+    else:
+        sort_key = F(sort_field)
 
-    # open first, then chosen sort, then tie-breaker
+    # open first, then chosen sort, then tie-breaker (id maakt de volgorde uniek voor de cursor)
     qs = qs.annotate(
         sort_open=Case(
             When(status="open", then=Value(0)),
             default=Value(1),
             output_field=IntegerField(),
-        )
-    ).order_by("sort_open", sort_field, "-created_at")
+        ),
+        sort_key=sort_key,
+    )
+    keys = [("sort_open", False), ("sort_key", direction == "desc"), ("created_at", True), ("id", True)]
+    return qs, keys, sort, direction
+
+
+@staff_required
+def signal_list(request):
+    now = timezone.localtime(timezone.now())
+    # --- BULK ACTIONS ---
+    if request.method == "POST":
+        return _signal_bulk_action(request, now)
+
+    open_id = request.GET.get("open", "").strip()
+
+    # behoud alle filters in sort-links, behalve sort/dir zelf (en de cursor: nieuwe sortering = pagina 1)
+    params = request.GET.copy()
+    params.pop("sort", None)
+    params.pop("dir", None)
+    params.pop("cursor", None)
+    params.pop("page", None)
+    base_qs = params.urlencode()
+
+    qs = Signal.objects.select_related(
+        "person",
+        "category",
+        "assigned_to",
+        "created_by",
+    )
+
+    qs, ranked, filters = _filter_signals(request, qs, now)
+
+    categories = SignalCategory.objects.all().order_by("name")
+    orgs = Organization.objects.all().order_by("organization_type", "name")
+
+
+    qs, keys, sort, direction = _sort_signals(request, qs, ranked)
 
-    User = get_user_model()
-    assignees = User.objects.filter(is_staff=True).order_by("username")
-    
     User = get_user_model()
     users = User.objects.filter(is_staff=True).order_by("username")
 
-    qs = qs.prefetch_related("notes__author", "history__actor") 
-    
-    per_page = int(request.GET.get("per_page", 25) or 25)
-    paginator = Paginator(qs, per_page)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    per_page = _per_page(request, 25)
+    page_obj = keyset_paginate(qs, keys, cursor=request.GET.get("cursor", "").strip(), per_page=per_page)
 
     return render(request, "core/signal_list.html", {
         "signals": qs,
         "categories": categories,
         "orgs": orgs,
-        "status": status,
-        "scope": scope,
-        "assigned": assigned,
+        **filters,
         "users": users,
-        "category_key": category_key,
-        "organization_id": organization_id,
-        "show_future": show_future,
-        "show_done": show_done,
-        "q": q,
         "now": now,
         "sort": sort,
         "dir": direction,
         "base_qs": base_qs,
         "active_nav": "signals",
         "open_id": open_id,
-        "assignees": assignees,
         "page_obj": page_obj,
-        "signals": page_obj.object_list,
-        "paginator": paginator,
+        "signals": page_obj["object_list"],
         "per_page": per_page,
     })
 
+SIGNAL_EXPORT_COLUMNS = [
+    ("ID", "id"),
+    ("Vanaf", "active_from"),
+    ("Status", "status"),
+    ("Achternaam", "person__last_name"),
+    ("Voornaam", "person__first_name"),
+    ("Type", "person__person_type"),
+    ("Onderdeel", "category__name"),
+    ("Titel", "title"),
+    ("Toegewezen aan", "assigned_to__username"),
+    ("Aangemaakt door", "created_by__username"),
+    ("Aangemaakt op", "created_at"),
+]
+
+
+@staff_required
+def signal_export(request):
+    """
+    Export van precies de huidige signal_list selectie (filters + sortering),
+    gestreamd als CSV of XLSX; alleen de export-kolommen worden opgehaald.
+    """
+    fmt = request.GET.get("format", "csv").strip()
+    if fmt not in EXPORT_FORMATS:
+        fmt = "csv"
+
+    now = timezone.localtime(timezone.now())
+    qs, ranked, _ = _filter_signals(request, Signal.objects.all(), now)
+    qs, keys, _, _ = _sort_signals(request, qs, ranked)
+    qs = qs.order_by(*[("-" if desc else "") + name for name, desc in keys])
+
+    status_labels = dict(Signal.STATUS_CHOICES)
+    type_labels = {"student": "Student", "employee": "Medewerker"}
+
+    def rows():
+        values = qs.values_list(*[field for _, field in SIGNAL_EXPORT_COLUMNS])
+        for (pk, active_from, status, last_name, first_name, person_type,
+             category, title, assigned_to, created_by, created_at) in values.iterator(chunk_size=2000):
+            yield [
+                pk,
+                timezone.localtime(active_from).strftime("%d-%m-%Y %H:%M"),
+                status_labels.get(status, status),
+                last_name,
+                first_name,
+                type_labels.get(person_type, person_type),
+                category,
+                title,
+                assigned_to,
+                created_by,
+                timezone.localtime(created_at).strftime("%d-%m-%Y %H:%M"),
+            ]
+
+    header = [label for label, _ in SIGNAL_EXPORT_COLUMNS]
+    return export_response(request, fmt, f"meldingen-{now:%Y%m%d-%H%M}", header, rows())
+
+
 @staff_required
 def signal_create_global(request):
     if request.method == "POST":
@@ -709,7 +794,88 @@ def signal_create_global(request):
         "form": form,
         "active_nav": "signals",
     })
+def _my_signals(request, now):
+    # basis queryset van notification_list (ook gebruikt voor de ETag)
+    qs = Signal.objects.filter(assigned_to=request.user)
+
+    if request.GET.get("show_future") != "1":
+        qs = qs.filter(active_from__lte=now)
+
+    if request.GET.get("show_done") != "1":
+        qs = qs.exclude(status="done")
+
+    return qs
+
+
+def _etag(request, *parts):
+    # geen 304 zolang er nog flash messages getoond moeten worden
+    if len(messages.get_messages(request)):
+        return None
+    raw = "-".join(str(p) for p in (request.user.id, *parts))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _request_memo(request, key, compute):
+    # condition() roept etag_func en last_modified_func apart aan; zo draait
+    # de marker-aggregate één keer per request
+    memo = request.__dict__.setdefault("_condition_memo", {})
+    if key not in memo:
+        memo[key] = compute()
+    return memo[key]
+
+
+def _notification_list_marker(request):
+    def compute():
+        now = timezone.now()
+        # de lijst toont ook naam en categorie: een hernoemde persoon moet de
+        # ETag net zo goed veranderen als een gewijzigd signal
+        return _my_signals(request, now).aggregate(
+            n=Count("id"),
+            due=Count("id", filter=Q(active_from__lte=now)),
+            last=Max("updated_at"),
+            person=Max("person__updated_at"),
+            category=Max("category__updated_at"),
+        )
+    return _request_memo(request, "notification_list", compute)
+
+
+def _notification_list_etag(request):
+    m = _notification_list_marker(request)
+    unread = NotificationCounter.get_unread(request.user.id)  # badge in de header
+    return _etag(request, m["n"], m["due"], m["last"], m["person"], m["category"], unread)
+
+
+def _notification_list_last_modified(request):
+    m = _notification_list_marker(request)
+    return max(filter(None, [m["last"], m["person"], m["category"]]), default=None)
+
+
+def _notification_dropdown_marker(request):
+    return _request_memo(request, "notification_dropdown", lambda: (
+        Notification.objects.filter(user=request.user, is_read=False).aggregate(
+            n=Count("id"),
+            last_id=Max("id"),
+            last=Max("signal__updated_at"),
+            person=Max("signal__person__updated_at"),
+            category=Max("signal__category__updated_at"),
+            created=Max("created_at"),
+        )
+    ))
+
+
+def _notification_dropdown_etag(request):
+    m = _notification_dropdown_marker(request)
+    return _etag(request, m["n"], m["last_id"], m["last"], m["person"], m["category"])
+
+
+def _notification_dropdown_last_modified(request):
+    m = _notification_dropdown_marker(request)
+    return max(filter(None, [m["last"], m["person"], m["category"], m["created"]]), default=None)
+
+
 @staff_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_notification_list_etag, last_modified_func=_notification_list_last_modified)
 def notification_list(request):
     now = timezone.localtime(timezone.now())
     open_id = request.GET.get("open", "").strip()
@@ -727,24 +893,13 @@ def notification_list(request):
     show_future = request.GET.get("show_future") == "1"
     show_done = request.GET.get("show_done") == "1"
 
-    qs = Signal.objects.select_related(
+    qs = _my_signals(request, now).select_related(
         "person",
         "category",
         "assigned_to",
         "created_by",
-    ).filter(
-        assigned_to=request.user
-    ).prefetch_related(
-        "notes__author", "history__actor"
     )
 
-
-    if not show_future:
-        qs = qs.filter(active_from__lte=now)
-
-    if not show_done:
-        qs = qs.exclude(status="done")
-
     allowed_sorts = {
         "active_from": "active_from",
         "student": "person__last_name",
@@ -766,10 +921,6 @@ def notification_list(request):
         )
     ).order_by("sort_open", sort_field, "-created_at")
 
-    
-    User = get_user_model()
-    assignees = User.objects.filter(is_staff=True).order_by("username")
-
     return render(request, "core/notification_list.html", {
         "signals": qs,              # ✅ template expects signals
         "now": now,
@@ -780,7 +931,6 @@ def notification_list(request):
         "dir": direction,
         "base_qs": base_qs,
         "active_nav": "notifications",
-        "assignees": assignees,
 
     })
 
@@ -801,12 +951,14 @@ def notification_mark_read(request, notif_id):
 
 
 @staff_required
+@transaction.atomic
 def notification_mark_all_read(request):
     if request.method == "POST":
-        Notification.objects.filter(user=request.user, is_read=False).update(
+        updated = Notification.objects.filter(user=request.user, is_read=False).update(
             is_read=True,
             read_at=timezone.now(),
         )
+        NotificationCounter.bump(request.user.id, -updated)
     return redirect("notification_list")
 
 @staff_required
@@ -882,22 +1034,14 @@ def notification_quick_update(request, signal_id):
         SignalNote.objects.create(signal=s, author=request.user, body=note)
 
     # mark current user's notifications for this signal as read
-    Notification.objects.filter(user=request.user, signal=s, is_read=False).update(
+    updated = Notification.objects.filter(user=request.user, signal=s, is_read=False).update(
         is_read=True, read_at=timezone.now()
     )
+    NotificationCounter.bump(request.user.id, -updated)
 
-    # if reassigned -> create a new unread notification for the new assignee
+    # if reassigned -> de notificatie voor de nieuwe behandelaar is al
+    # aangemaakt bij s.save() (zie core.receivers)
     if "assigned_to" in changes and s.assigned_to:
-        Notification.objects.get_or_create(
-            user=s.assigned_to,
-            signal=s,
-            defaults={
-                "title": f"Melding: {s.title}",
-                "body": s.body or "",
-                "url": f"/notifications/?open={s.id}",
-                "is_read": False,
-            }
-        )
         # ook log specifieke reassignment actie (handig)
         SignalHistory.objects.create(
             signal=s,
@@ -916,10 +1060,40 @@ def notification_quick_update(request, signal_id):
 
 
 @staff_required
-def notification_dropdown(request):
-    from core.services.notifications import ensure_notifications_for_user
-    ensure_notifications_for_user(request.user)
+async def notification_stream(request):
+    """
+    Server-Sent Events: pusht "unread" en "notification" events naar de bel
+    in base.html. Alleen zinvol onder ASGI (config/asgi.py); een open
+    verbinding kost één coroutine + queue, geen thread. Alleen met
+    settings.NOTIFICATION_STREAM_ENABLED.
+    """
+    if not events.enabled():
+        raise Http404
+    user = await request.auser()
+    unread = await sync_to_async(NotificationCounter.get_unread)(user.id)
+
+    async def stream():
+        async with events.subscribe(user.id) as queue:
+            yield _sse("unread", {"count": unread})
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    # houdt proxies/load balancers wakker
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(message["event"], message["data"])
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
 
+@staff_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_notification_dropdown_etag, last_modified_func=_notification_dropdown_last_modified)
+def notification_dropdown(request):
     qs = (
         Notification.objects
         .select_related("signal", "signal__person", "signal__category")
@@ -932,30 +1106,7 @@ def notification_dropdown(request):
     })
 @staff_required
 def employee_list(request):
-    qs = Person.objects.filter(person_type="employee").select_related(
-        "employee_profile",
-    )
-
-    q = request.GET.get("q", "").strip()
-    job_title = request.GET.get("job_title", "").strip()
-
-    if q:
-        qs = qs.filter(
-            Q(first_name__icontains=q) |
-            Q(last_name__icontains=q) |
-            Q(email__icontains=q) |
-            Q(phone__icontains=q)
-        )
-
-    if job_title:
-        qs = qs.filter(employee_profile__job_title__icontains=job_title)
-
-    return render(request, "core/employee_list.html", {
-        "employees": qs.order_by("last_name", "first_name"),
-        "q": q,
-        "job_title": job_title,
-        "active_nav": "people",
-    })
+    return _people_directory(request, "employee", "core/employee_list.html")
 
 
 @staff_required
@@ -1028,6 +1179,36 @@ def employee_create(request):
     return render(request, "core/employee_create.html", {"form": form, "active_nav": "employees"})
 
 
+DIALOG_NOTES = 5
+DIALOG_HISTORY = 8
+
+
+def _prefetch_dialog_children(signals):
+    # alleen wat signal_dialog.html toont: nieuwste 5 notities en 8 history-regels (+ totalen)
+    prefetch_top_n(signals, "notes", DIALOG_NOTES, ("-created_at", "-id"),
+                   to_attr="recent_notes", count_attr="notes_total", select_related=("author",))
+    prefetch_top_n(signals, "history", DIALOG_HISTORY, ("-created_at", "-id"),
+                   to_attr="recent_history", count_attr="history_total", select_related=("actor",))
+    return signals
+
+
+@staff_required
+def signal_dialog(request, signal_id):
+    # dialog-fragment, pas geladen als de melding geopend wordt (zie openDialog in base.html)
+    sig = get_object_or_404(Signal.objects.select_related("person", "category"), id=signal_id)
+    _prefetch_dialog_children([sig])
+
+    return_url = request.GET.get("return_url", "")
+    if not url_has_allowed_host_and_scheme(return_url, allowed_hosts={request.get_host()}):
+        return_url = reverse("signal_list")
+
+    return render(request, "core/partials/signal_dialog.html", {
+        "sig": sig,
+        "assignees": get_user_model().objects.filter(is_staff=True).order_by("username"),
+        "return_url": return_url,
+    })
+
+
 @staff_required
 def signal_notes(request, signal_id):
     sig = get_object_or_404(
@@ -1391,6 +1572,73 @@ def roster_delete(request, person_id, roster_id):
         roster.delete()
         messages.success(request, "Rooster verwijderd.")
     return redirect(return_url)
+
+
+WEEKDAY_LABELS = ["Ma", "Di", "Wo", "Do", "Vr", "Za", "Zo"]
+
+
+@staff_required
+def team_schedule(request):
+    """
+    Teamrooster voor een locatie en/of organisatie: iedereen onder elkaar,
+    per dag status en gewerkte uren, voor een week of een maand.
+    """
+    location_id = request.GET.get("location", "").strip()
+    organization_id = request.GET.get("org", "").strip()
+    status = request.GET.get("status", "").strip()
+    period = request.GET.get("period", "week").strip()
+    if period not in ("week", "month"):
+        period = "week"
+
+    if period == "month":
+        start = _parse_month(request.GET.get("month", "").strip())
+        end = _add_month(start, 1) - timedelta(days=1)
+        prev_start, next_start = _add_month(start, -1), _add_month(start, 1)
+    else:
+        try:
+            anchor = datetime.strptime(request.GET.get("date", "").strip(), "%Y-%m-%d").date()
+        except ValueError:
+            anchor = timezone.localdate()
+        start = anchor - timedelta(days=anchor.weekday())
+        end = start + timedelta(days=6)
+        prev_start, next_start = start - timedelta(days=7), start + timedelta(days=7)
+
+    people = []
+    if location_id.isdigit() or organization_id.isdigit():
+        qs = Person.objects.filter(person_type="student")
+        if location_id.isdigit():
+            qs = qs.filter(student_profile__location_id=int(location_id))
+        if organization_id.isdigit():
+            qs = qs.filter(student_profile__organization_id=int(organization_id))
+        if status:
+            qs = qs.filter(student_profile__status=status)
+        people = list(qs.only("id", "first_name", "last_name").order_by("last_name", "first_name", "id"))
+
+    days, rows, day_totals = build_team_schedule(people, start, end)
+
+    params = request.GET.copy()
+    for key in ("date", "month"):
+        params.pop(key, None)
+    base_qs = params.urlencode()
+
+    return render(request, "core/team_schedule.html", {
+        "rows": rows,
+        "days": [(d, WEEKDAY_LABELS[d.weekday()]) for d in days],
+        "day_totals": day_totals,
+        "start": start,
+        "end": end,
+        "prev_start": prev_start,
+        "next_start": next_start,
+        "period": period,
+        "location_id": location_id,
+        "organization_id": organization_id,
+        "status": status,
+        "status_choices": StudentProfile.STATUS_CHOICES,
+        "locations": Location.objects.all().order_by("name"),
+        "orgs": Organization.objects.all().order_by("name"),
+        "base_qs": base_qs,
+        "active_nav": "team_schedule",
+    })
 @staff_required
 def workpackage_list(request):
     q = request.GET.get("q", "").strip()
@@ -1490,6 +1738,53 @@ def roster_save(request, person_id):
     messages.success(request, "Rooster opgeslagen.")
     return redirect(return_url)
 
+def _wants_json(request):
+    # fetch() uit het dag-dialoog (person_detail) vraagt expliciet om JSON
+    return "application/json" in request.headers.get("Accept", "")
+
+
+def _roster_day_response(request, person, rd):
+    """
+    Na async opslaan van een dag: alleen de opnieuw gerenderde kalendercel en
+    de maandtotalen (badges + werkpakketten) als HTML in JSON, i.p.v. de hele
+    person_detail pagina.
+    """
+    rd.refresh_from_db()  # uren zoals opgeslagen (8 -> 8.00), net als op de volledige pagina
+    d = rd.date
+    month_start = d.replace(day=1)
+    month_end = _month_end(month_start)
+    # de cel toont de roosters van de hele maand, net als het grid
+    roster_calendar = RosterCalendar.for_person(person, month_start, month_end)
+    parents, children_by_parent = _work_package_choices()
+
+    page_url = request.POST.get("return_url", "")
+    if not url_has_allowed_host_and_scheme(page_url, allowed_hosts={request.get_host()}):
+        page_url = f"{reverse('person_detail', args=[person.id])}?tab=roster&month={month_start:%Y-%m}"
+
+    # zonder request renderen: geen context processors (notificatieteller) per fragment
+    context = {
+        "csrf_token": get_token(request),
+        "person": person,
+        "page_url": page_url,
+        "parents": parents,
+        "children_by_parent": children_by_parent,
+        "cell": _roster_cell(
+            d,
+            roster_calendar.planned(person.id, d),
+            rd,
+            _work_entries(person, d, d).get(d, []),
+            roster_calendar.rosters(person.id),
+        ),
+        **month_summary(person.id, month_start, month_end),
+    }
+    return JsonResponse({
+        "date": f"{d:%Y-%m-%d}",
+        "cell": render_to_string("core/partials/roster_day_cell.html", context),
+        "stats": render_to_string("core/partials/roster_month_stats.html", context),
+        "totals": render_to_string("core/partials/roster_month_totals.html", context),
+    })
+
+
 @staff_required
 def roster_day_save(request, person_id, day):
     person = get_object_or_404(Person, id=person_id)
@@ -1499,6 +1794,8 @@ def roster_day_save(request, person_id, day):
     try:
         d = datetime.strptime(day, "%Y-%m-%d").date()
     except ValueError:
+        if _wants_json(request):
+            return JsonResponse({"errors": ["Ongeldige datum."]}, status=400)
         messages.error(request, "Ongeldige datum.")
         return redirect(request.POST.get("return_url") or "person_detail", person_id=person.id)
 
@@ -1507,30 +1804,55 @@ def roster_day_save(request, person_id, day):
     actual_hours = _decimal_or_none(request.POST.get("actual_hours"))
     note = request.POST.get("note", "")
 
-    rd, _ = RosterDay.objects.get_or_create(person=person, date=d)
-    rd.status = status
-    rd.planned_hours = planned_hours
-    rd.actual_hours = actual_hours
-    rd.note = note
-    rd.save()
-
     # werkpakket inputs: name="wp_<id>"
+    work = {}
     for key, val in request.POST.items():
         if not key.startswith("wp_"):
             continue
         wp_id = key.replace("wp_", "").strip()
         if not wp_id.isdigit():
             continue
+        work[(person.id, d, int(wp_id))] = _decimal_or_none(val)
+
+    unknown = unknown_work_packages(wp_id for _, _, wp_id in work)
+    if unknown:
+        error = f"Onbekend werkpakket: {', '.join(map(str, unknown))}. Niets opgeslagen."
+        if _wants_json(request):
+            return JsonResponse({"errors": [error]}, status=400)
+        messages.error(request, error)
+        return redirect(request.POST.get("return_url") or "person_detail", person_id=person.id)
 
-        hours = _decimal_or_none(val)
-        wp_id_int = int(wp_id)
+    with transaction.atomic():
+        # werkpakketten eerst: het opslaan van de dag ververst PlannedDay (core.receivers)
+        write_day_work(work)
+        rd, _ = RosterDay.objects.update_or_create(
+            person=person,
+            date=d,
+            defaults={"status": status, "planned_hours": planned_hours, "actual_hours": actual_hours, "note": note},
+        )
 
-        if hours is None or hours == 0:
-            RosterDayWork.objects.filter(person=person, date=d, work_package_id=wp_id_int).delete()
-        else:
-            obj, _ = RosterDayWork.objects.get_or_create(person=person, date=d, work_package_id=wp_id_int)
-            obj.hours = hours
-            obj.save()
+    if _wants_json(request):
+        return _roster_day_response(request, person, rd)
 
     messages.success(request, "Dag bijgewerkt.")
     return redirect(request.POST.get("return_url") or "person_detail", person_id=person.id)
+
+
+@staff_required
+def timesheet_save(request):
+    """
+    Uren van een week/maand voor één of meer personen in één request (JSON).
+    Formaat: zie core.services.timesheet.parse_timesheet. Alles of niets:
+    bij een fout 400 met {"errors": [...]} en wordt er niets opgeslagen.
+    """
+    if request.method != "POST":
+        return JsonResponse({"errors": ["Alleen POST."]}, status=405)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"errors": ["Ongeldige JSON."]}, status=400)
+
+    days, work, errors = parse_timesheet(payload)
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+    return JsonResponse(apply_timesheet(days, work))